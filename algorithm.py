@@ -1,37 +1,339 @@
+from array import array
 from collections import deque
-from typing import List, Tuple, Set, Optional
-import heapq
+from typing import Callable, Dict, Iterable, List, Tuple, Set, Optional
 import heapq
+import itertools
+import math
+import time
+
+
+DIAGONAL_COST = math.sqrt(2)
+
+_versions = itertools.count(1)
+
+
+class SearchBudgetExceeded(Exception):
+    """Поиск остановлен: раскрыто max_expansions клеток, а цель не найдена"""
+
+    def __init__(self, expanded: int):
+        super().__init__(expanded)
+        self.expanded = expanded
+
+    def __str__(self) -> str:
+        return f"Expansion budget exceeded after {self.expanded} cells"
 
 
 class GridGraph:
+    """
+    Сетка с плоским буфером проходимости: один байт на клетку.
+    Буфер окружён рамкой из непроходимых клеток, поэтому обход соседей
+    по смещениям не требует проверки границ.
+    costs - необязательный слой стоимостей входа в клетку (1..255, байт на клетку).
+    connectivity - 4 или 8 соседей; при 8 диагональный шаг стоит DIAGONAL_COST,
+    corner_cutting разрешает диагональ, если свободна хотя бы одна из двух
+    ортогональных клеток (иначе должны быть свободны обе).
+    offsets содержит только ортогональные смещения, moves - все допустимые ходы.
+    version берётся из общего для процесса счётчика при создании сетки и при
+    каждом изменении через add_obstacle/remove_obstacle/set_cost, поэтому
+    однозначно определяет состояние сетки (прямая запись в cells его не меняет).
+    cost_version так же меняется только при замене или изменении слоя costs.
+    """
+
+    FREE = 1
+    BLOCKED = 0
 
-    def __init__(self, rows: int, cols: int, obstacles: Set[Tuple[int, int]]):
+    def __init__(self, rows: int, cols: int,
+                 obstacles: Optional[Iterable[Tuple[int, int]]] = None,
+                 costs: Optional[Dict[Tuple[int, int], int]] = None,
+                 connectivity: int = 4,
+                 corner_cutting: bool = False):
+        
+        self._init_layout(rows, cols, connectivity, corner_cutting)
+        
+        self.cells = bytearray(self.size)
+        free_row = bytes([self.FREE]) * cols
+        for row in range(rows):
+            base = (row + 1) * self.stride + 1
+            self.cells[base:base + cols] = free_row
+        
+        if obstacles:
+            for row, col in obstacles:
+                if 0 <= row < rows and 0 <= col < cols:
+                    self.cells[self.index(row, col)] = self.BLOCKED
+        
+        if costs:
+            for (row, col), cost in costs.items():
+                self.set_cost(row, col, cost)
+    
+    @classmethod
+    def from_buffer(cls, rows: int, cols: int, cells,
+                    costs=None,
+                    connectivity: int = 4,
+                    corner_cutting: bool = False) -> "GridGraph":
+        """
+        Сетка поверх готового буфера (bytearray, memoryview разделяемой памяти
+        или mmap) в раскладке cells с рамкой, без копирования
+        """
+        
+        grid = cls.__new__(cls)
+        grid._init_layout(rows, cols, connectivity, corner_cutting)
+        for name, layer in (("cells", cells), ("costs", costs)):
+            if layer is not None and len(layer) != grid.size:
+                raise ValueError(f"{name} buffer has {len(layer)} bytes, expected {grid.size}")
+        grid.cells = cells
+        grid.costs = costs
+        return grid
+    
+    def _init_layout(self, rows: int, cols: int, connectivity: int, corner_cutting: bool) -> None:
+        if connectivity not in (4, 8):
+            raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
         
         self.rows = rows
         self.cols = cols
-        self.obstacles = obstacles
+        self.stride = cols + 2
+        self.size = (rows + 2) * self.stride
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
         self.directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        self.offsets = [-self.stride, self.stride, -1, 1]
+        self.moves = [(offset, 1, 0, 0) for offset in self.offsets]
+        if connectivity == 8:
+            for dr, dc in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+                self.directions.append((dr, dc))
+                self.moves.append((dr * self.stride + dc, DIAGONAL_COST, dr * self.stride, dc))
+        self.listeners: List[Callable[[int, int], None]] = []
+        self.costs: Optional[bytearray] = None
+        self.version = next(_versions)
+        self.cost_version = self.version
+        self.components = None
+    
+    def index(self, row: int, col: int) -> int:
+        return (row + 1) * self.stride + col + 1
+    
+    def coords(self, index: int) -> Tuple[int, int]:
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+    
+    @property
+    def obstacles(self) -> Set[Tuple[int, int]]:
+        """Множество препятствий, восстановленное из буфера"""
+        blocked = set()
+        for row in range(self.rows):
+            base = (row + 1) * self.stride + 1
+            line = bytes(self.cells[base:base + self.cols])
+            col = line.find(self.BLOCKED)
+            while col != -1:
+                blocked.add((row, col))
+                col = line.find(self.BLOCKED, col + 1)
+        return blocked
+    
+    def _set_cell(self, row: int, col: int, value: int) -> None:
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return
+        index = self.index(row, col)
+        if self.cells[index] == value:
+            return
+        self.cells[index] = value
+        self.version = next(_versions)
+        for listener in self.listeners:
+            listener(row, col)
+    
+    def add_obstacle(self, row: int, col: int) -> None:
+        self._set_cell(row, col, self.BLOCKED)
+    
+    def remove_obstacle(self, row: int, col: int) -> None:
+        self._set_cell(row, col, self.FREE)
+    
+    def cost_field(self) -> bytearray:
+        """Слой стоимостей; создаётся при первом обращении со стоимостью 1"""
+        if self.costs is None:
+            self.costs = bytearray([255]) * self.size
+            unit_row = bytes([1]) * self.cols
+            for row in range(self.rows):
+                base = (row + 1) * self.stride + 1
+                self.costs[base:base + self.cols] = unit_row
+        return self.costs
+    
+    def set_cost(self, row: int, col: int, cost: int) -> None:
+        if not 1 <= cost <= 255:
+            raise ValueError(f"Cell cost must be in 1..255, got {cost}")
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self.cost_field()[self.index(row, col)] = cost
+            self.version = next(_versions)
+            self.cost_version = self.version
+    
+    def min_cost(self) -> int:
+        """Минимальная стоимость клетки - множитель допустимой эвристики"""
+        if self.costs is None:
+            return 1
+        costs = self.costs
+        step = 1 << 20
+        best = 255
+        for start in range(0, len(costs), step):
+            chunk = costs[start:start + step]
+            if not isinstance(chunk, bytearray):
+                chunk = chunk.tobytes()
+            for cost in range(1, best):
+                if chunk.find(cost) != -1:
+                    best = cost
+                    break
+            if best == 1:
+                break
+        return best
+    
+    def unreachable(self, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+        """Истина, если подключённый индекс компонент разделяет start и end"""
+        return self.components is not None and not self.components.connected(start, end)
     
     def is_valid(self, row: int, col: int) -> bool:
         
         return (0 <= row < self.rows and 
                 0 <= col < self.cols and 
-                (row, col) not in self.obstacles)
+                self.cells[self.index(row, col)] == self.FREE)
     
     def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
         
         neighbors = []
         for dr, dc in self.directions:
             new_row, new_col = row + dr, col + dc
-            if self.is_valid(new_row, new_col):
-                neighbors.append((new_row, new_col))
+            if not self.is_valid(new_row, new_col):
+                continue
+            if dr and dc:
+                side_a = self.is_valid(row + dr, col)
+                side_b = self.is_valid(row, col + dc)
+                if not (side_a or side_b if self.corner_cutting else side_a and side_b):
+                    continue
+            neighbors.append((new_row, new_col))
         return neighbors
 
 
+def _corner_open(cells: bytearray, current: int, side_a: int, side_b: int,
+                 corner_cutting: bool) -> bool:
+    if corner_cutting:
+        return bool(cells[current + side_a] or cells[current + side_b])
+    return bool(cells[current + side_a] and cells[current + side_b])
+
+
+class SearchWorkspace:
+    """
+    Заранее выделенные массивы для повторных поисков на одной сетке.
+    stamps хранит поколение клетки: меньше generation - не тронута в этом
+    поиске, generation - открыта, generation + 1 - закрыта. Поэтому сброс
+    между поисками - это только увеличение generation.
+    """
+
+    def __init__(self, grid: GridGraph):
+        
+        self.grid = grid
+        self.stamps = array('I', [0]) * grid.size
+        self.g_score = array('i', [0]) * grid.size
+        self.parents = bytearray(grid.size)
+        self.generation = 0
+    
+    def begin(self) -> int:
+        """Начало нового поиска; возвращает номер поколения"""
+        self.generation += 2
+        if self.generation >= 0xFFFFFFFF:
+            self.stamps = array('I', [0]) * self.grid.size
+            self.generation = 2
+        return self.generation
+
+
+def _workspace_for(grid: GridGraph, workspace: Optional[SearchWorkspace]) -> SearchWorkspace:
+    if workspace is None:
+        return SearchWorkspace(grid)
+    if workspace.grid is not grid:
+        raise ValueError("Workspace is bound to a different grid")
+    return workspace
+
+
+class SearchStats:
+    """
+    Счётчики поиска: передаются в поиск аргументом stats и накапливаются
+    между вызовами. Во время поиска счёт идёт в локальных переменных,
+    в stats он записывается один раз по завершении; без stats поиск только
+    проверяет, заданы ли обратные вызовы.
+    expanded - раскрытые клетки (узлы), pushes - добавления в очередь,
+    heap_peak - наибольший размер очереди (фронта), reopened - повторные
+    добавления клетки с меньшим g, timings - секунды по фазам.
+    on_expand(row, col) и on_push(row, col) вызываются из цикла поиска.
+    Ранние выходы (неверная клетка, start == end, разные компоненты)
+    счётчики не меняют.
+    """
+
+    def __init__(self,
+                 on_expand: Optional[Callable[[int, int], None]] = None,
+                 on_push: Optional[Callable[[int, int], None]] = None):
+        
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.searches = 0
+        self.expanded = 0
+        self.pushes = 0
+        self.heap_peak = 0
+        self.reopened = 0
+        self.timings: Dict[str, float] = {}
+    
+    def record(self, expanded: int, pushes: int, heap_peak: int, reopened: int = 0,
+               **phases: float) -> None:
+        self.searches += 1
+        self.expanded += expanded
+        self.pushes += pushes
+        self.heap_peak = max(self.heap_peak, heap_peak)
+        self.reopened += reopened
+        for phase, seconds in phases.items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+    
+    def as_dict(self) -> dict:
+        return {
+            "searches": self.searches,
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "heap_peak": self.heap_peak,
+            "reopened": self.reopened,
+            "timings_ms": {phase: seconds * 1000 for phase, seconds in self.timings.items()},
+        }
+
+
+def _start_clock(stats: Optional[SearchStats]) -> float:
+    return time.perf_counter() if stats is not None else 0.0
+
+
+def _finish(stats: Optional[SearchStats], began: float, counters: Tuple[int, int, int, int],
+            build: Optional[Callable] = None, *args):
+    """Построение пути build(*args) с записью счётчиков и фаз search/reconstruct в stats"""
+    if stats is None:
+        return build(*args) if build is not None else None
+    searched = time.perf_counter()
+    path = build(*args) if build is not None else None
+    stats.record(*counters, search=searched - began, reconstruct=time.perf_counter() - searched)
+    return path
+
+
+def _walk_directions(grid: GridGraph, parents: bytearray, source: int, target: int) -> List[Tuple[int, int]]:
+    offsets = [move[0] for move in grid.moves]
+    path = [grid.coords(target)]
+    node = target
+    while node != source:
+        node -= offsets[parents[node]]
+        path.append(grid.coords(node))
+    return path[::-1]
+
+
+def _reconstruct(grid: GridGraph, parent: dict, end: int) -> List[Tuple[int, int]]:
+    path = []
+    node = end
+    while node != -1:
+        path.append(grid.coords(node))
+        node = parent[node]
+    return path[::-1]
+
+
 def bfs_shortest_path(grid: GridGraph, 
                       start: Tuple[int, int], 
-                      end: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+                      end: Tuple[int, int],
+                      workspace: Optional[SearchWorkspace] = None,
+                      stats: Optional[SearchStats] = None) -> Optional[List[Tuple[int, int]]]:
     
     
     if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
@@ -40,29 +342,147 @@ def bfs_shortest_path(grid: GridGraph,
     if start == end:
         return [start]
     
-    queue = deque([start]) 
-    visited = {start} 
-    parent = {start: None}
+    if grid.unreachable(start, end):
+        return None
     
-    while queue:
-        current = queue.popleft()
-        
-        if current == end:
+    workspace = _workspace_for(grid, workspace)
+    generation = workspace.begin()
+    stamps = workspace.stamps
+    parents = workspace.parents
+    cells = grid.cells
+    directions = list(enumerate(grid.offsets))
+    moves = [(direction, move) for direction, move in enumerate(grid.moves)]
+    general = grid.connectivity == 8
+    corner_cutting = grid.corner_cutting
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    
+    frontier = [source]
+    stamps[source] = generation
+    expanded = 0
+    pushes = 1
+    frontier_peak = 1
+    
+    while frontier:
+        next_frontier = []
+        append = next_frontier.append
+        for current in frontier:
+            if on_expand is not None:
+                on_expand(*grid.coords(current))
             
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = parent[node]
-            return path[::-1] 
-        
-        for neighbor in grid.get_neighbors(current[0], current[1]):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                parent[neighbor] = current
-                queue.append(neighbor)
+            if current == target:
+                expanded += frontier.index(current) + 1
+                return _finish(stats, began, (expanded, pushes + len(next_frontier), frontier_peak, 0),
+                               _walk_directions, grid, parents, source, target)
+            
+            if general:
+                for direction, (offset, _, side_a, side_b) in moves:
+                    neighbor = current + offset
+                    if not cells[neighbor] or stamps[neighbor] >= generation:
+                        continue
+                    if side_b and not _corner_open(cells, current, side_a, side_b, corner_cutting):
+                        continue
+                    stamps[neighbor] = generation
+                    parents[neighbor] = direction
+                    append(neighbor)
+                    if on_push is not None:
+                        on_push(*grid.coords(neighbor))
+                continue
+            
+            for direction, offset in directions:
+                neighbor = current + offset
+                if cells[neighbor] and stamps[neighbor] < generation:
+                    stamps[neighbor] = generation
+                    parents[neighbor] = direction
+                    append(neighbor)
+                    if on_push is not None:
+                        on_push(*grid.coords(neighbor))
+        
+        expanded += len(frontier)
+        pushes += len(next_frontier)
+        if len(next_frontier) > frontier_peak:
+            frontier_peak = len(next_frontier)
+        frontier = next_frontier
     
-    return None
+    return _finish(stats, began, (expanded, pushes, frontier_peak, 0))
+
+
+NO_PARENT = 255
+
+
+def bfs_distance_field(grid: GridGraph,
+                       source: Tuple[int, int],
+                       with_parents: bool = False) -> Tuple[array, Optional[bytearray]]:
+    """
+    BFS по уровням из одной клетки по всей сетке.
+    Возвращает: (расстояния по индексам буфера, -1 если недостижимо;
+                 номер направления из grid.offsets, которым пришли в клетку)
+    """
+    
+    distances = array('i', [-1]) * grid.size
+    parents = bytearray([NO_PARENT]) * grid.size if with_parents else None
+    
+    if not grid.is_valid(source[0], source[1]):
+        return distances, parents
+    
+    cells = grid.cells
+    directions = list(enumerate(grid.offsets))
+    origin = grid.index(source[0], source[1])
+    distances[origin] = 0
+    frontier = [origin]
+    level = 0
+    
+    while frontier:
+        level += 1
+        next_frontier = []
+        push = next_frontier.append
+        if parents is None:
+            for current in frontier:
+                for _, offset in directions:
+                    neighbor = current + offset
+                    if cells[neighbor] and distances[neighbor] < 0:
+                        distances[neighbor] = level
+                        push(neighbor)
+        else:
+            for current in frontier:
+                for direction, offset in directions:
+                    neighbor = current + offset
+                    if cells[neighbor] and distances[neighbor] < 0:
+                        distances[neighbor] = level
+                        parents[neighbor] = direction
+                        push(neighbor)
+        frontier = next_frontier
+    
+    return distances, parents
+
+
+def reached_count(distances: array) -> int:
+    """Количество клеток, достигнутых при построении поля расстояний"""
+    return len(distances) - distances.count(-1)
+
+
+def path_from_field(grid: GridGraph,
+                    distances: array,
+                    parents: bytearray,
+                    end: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+    """Восстановление пути до end по полю направлений из bfs_distance_field"""
+    
+    if not (0 <= end[0] < grid.rows and 0 <= end[1] < grid.cols):
+        return None
+    
+    node = grid.index(end[0], end[1])
+    if distances[node] < 0:
+        return None
+    
+    offsets = grid.offsets
+    path = [end]
+    while parents[node] != NO_PARENT:
+        node -= offsets[parents[node]]
+        path.append(grid.coords(node))
+    return path[::-1]
 
 
 def find_path(rows: int, 
@@ -75,102 +495,517 @@ def find_path(rows: int,
     return bfs_shortest_path(graph, start, end)
 
 
+def _bfs_parents(grid: GridGraph, source: int, targets: Set[int]) -> Dict[int, int]:
+    """BFS из source до тех пор, пока не будут достигнуты все targets"""
+    
+    cells = grid.cells
+    offsets = grid.offsets
+    remaining = set(targets)
+    remaining.discard(source)
+    
+    queue = deque([source])
+    parent = {source: -1}
+    
+    while queue and remaining:
+        current = queue.popleft()
+        
+        for offset in offsets:
+            neighbor = current + offset
+            if cells[neighbor] and neighbor not in parent:
+                parent[neighbor] = current
+                queue.append(neighbor)
+                remaining.discard(neighbor)
+    
+    return parent
+
+
+def find_paths(rows: int,
+               cols: int,
+               obstacles: Set[Tuple[int, int]],
+               pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[Optional[List[Tuple[int, int]]]]:
+    """
+    Пакетный поиск: один BFS на каждую стартовую клетку.
+    Возвращает пути в порядке pairs, как при вызове find_path для каждой пары.
+    """
+
+    graph = GridGraph(rows, cols, obstacles)
+    results: List[Optional[List[Tuple[int, int]]]] = [None] * len(pairs)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    
+    for i, (start, end) in enumerate(pairs):
+        if not graph.is_valid(start[0], start[1]) or not graph.is_valid(end[0], end[1]):
+            continue
+        groups.setdefault(start, []).append(i)
+    
+    for start, indices in groups.items():
+        source = graph.index(start[0], start[1])
+        targets = {graph.index(pairs[i][1][0], pairs[i][1][1]) for i in indices}
+        parent = _bfs_parents(graph, source, targets)
+        for i in indices:
+            target = graph.index(pairs[i][1][0], pairs[i][1][1])
+            if target in parent:
+                results[i] = _reconstruct(graph, parent, target)
+    
+    return results
+
+
 def heuristic(pos: Tuple[int, int], end: Tuple[int, int]) -> int:
     """Манхэттенское расстояние - эвристика для A*"""
     return abs(pos[0] - end[0]) + abs(pos[1] - end[1])
 
 
+def manhattan_distance(dr: int, dc: int) -> float:
+    """Эвристики ниже принимают модули разностей строк и столбцов"""
+    return dr + dc
+
+
+def chebyshev_distance(dr: int, dc: int) -> float:
+    return dr if dr > dc else dc
+
+
+def octile_distance(dr: int, dc: int) -> float:
+    return dr + dc + (DIAGONAL_COST - 2) * (dr if dr < dc else dc)
+
+
+def euclidean_distance(dr: int, dc: int) -> float:
+    return math.hypot(dr, dc)
+
+
+HEURISTICS = {
+    "manhattan": manhattan_distance,
+    "chebyshev": chebyshev_distance,
+    "octile": octile_distance,
+    "euclidean": euclidean_distance,
+}
+
+
+def _a_star_moves(grid: GridGraph,
+                  source: int,
+                  target: int,
+                  heuristic_fn: Callable[[int, int], float],
+                  limit: int = -1,
+                  stats: Optional[SearchStats] = None,
+                  estimate: Optional[Callable[[int], float]] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    cells = grid.cells
+    moves = grid.moves
+    corner_cutting = grid.corner_cutting
+    stride = grid.stride
+    end_row, end_col = divmod(target, stride)
+    
+    open_set = [(0, source)]
+    parent = {source: -1}
+    g_score = {source: 0}
+    closed = set()
+    visited_count = 0
+    pushes = 1
+    heap_peak = 1
+    reopened = 0
+    
+    while open_set:
+        if len(open_set) > heap_peak:
+            heap_peak = len(open_set)
+        current_f, current = heapq.heappop(open_set)
+        
+        if current in closed:
+            continue
+        
+        closed.add(current)
+        visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
+        
+        if current == target:
+            return _finish(stats, began, (visited_count, pushes, heap_peak, reopened),
+                           _reconstruct, grid, parent, target), visited_count
+        if visited_count == limit:
+            _finish(stats, began, (visited_count, pushes, heap_peak, reopened))
+            raise SearchBudgetExceeded(visited_count)
+        
+        current_g = g_score[current]
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
+            if side_b and not _corner_open(cells, current, side_a, side_b, corner_cutting):
+                continue
+            
+            new_g = current_g + cost
+            if neighbor not in g_score or new_g < g_score[neighbor]:
+                if neighbor in g_score:
+                    reopened += 1
+                g_score[neighbor] = new_g
+                parent[neighbor] = current
+                if estimate is None:
+                    row, col = divmod(neighbor, stride)
+                    f_score = new_g + heuristic_fn(abs(row - end_row), abs(col - end_col))
+                else:
+                    f_score = new_g + estimate(neighbor)
+                heapq.heappush(open_set, (f_score, neighbor))
+                pushes += 1
+                if on_push is not None:
+                    on_push(*grid.coords(neighbor))
+    
+    return _finish(stats, began, (visited_count, pushes, heap_peak, reopened)), visited_count
+
+
+_NODE_MASK = (1 << 32) - 1
+_G_SHIFT = 32
+_F_SHIFT = 64
+
+
 def a_star_shortest_path(grid: GridGraph, 
                          start: Tuple[int, int], 
-                         end: Tuple[int, int]) -> Optional[Tuple[List[Tuple[int, int]], int]]:
+                         end: Tuple[int, int],
+                         heuristic_fn: Optional[Callable[[int, int], float]] = None,
+                         workspace: Optional[SearchWorkspace] = None,
+                         estimate: Optional[Callable[[int], int]] = None,
+                         max_expansions: Optional[int] = None,
+                         stats: Optional[SearchStats] = None
+                         ) -> Optional[Tuple[List[Tuple[int, int]], int]]:
     """
     A* алгоритм поиска кратчайшего пути.
+    heuristic_fn - функция от модулей разностей координат (см. HEURISTICS);
+    по умолчанию манхэттенская для 4 соседей и октильная для 8
+    (манхэттенская при 8 соседях переоценивает и теряет оптимальность).
+    Для 4 соседей без heuristic_fn g, родители и закрытое множество хранятся
+    в плоских массивах, элемент кучи - одно целое (f, g по убыванию, клетка),
+    поэтому при равных f раньше раскрывается клетка с большим g; устаревшие
+    элементы вычищаются, когда куча вдвое больше числа открытых клеток.
+    workspace (SearchWorkspace той же сетки) позволяет не выделять массивы
+    заново при каждом вызове; используется только в этой 4-связной ветке.
+    estimate - согласованная оценка до end по индексу клетки (например,
+    LandmarkOracle.heuristic_for) вместо манхэттенской или октильной; для
+    4 соседей целочисленная. Вместе с heuristic_fn не задаётся.
+    max_expansions - лимит раскрытых клеток (не меньше 1); при его исчерпании
+    до нахождения цели поднимается SearchBudgetExceeded.
+    stats (SearchStats) получает счётчики и время фаз поиска.
     Возвращает: (путь, количество посещённых клеток)
     """
     
+    if max_expansions is not None and max_expansions < 1:
+        raise ValueError(f"Expansion budget must be positive, got {max_expansions}")
+    if heuristic_fn is not None and estimate is not None:
+        raise ValueError("Pass either heuristic_fn or estimate, not both")
+    
     if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
         return None, 0
     
     if start == end:
         return [start], 1
     
-    open_set = [(0, start)]
-    parent = {start: None}
-    g_score = {start: 0}  
+    if grid.unreachable(start, end):
+        return None, 0
+    
+    cells = grid.cells
+    offsets = grid.offsets
+    stride = grid.stride
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+    limit = -1 if max_expansions is None else max_expansions
+    
+    if grid.connectivity == 8 or heuristic_fn is not None:
+        if heuristic_fn is None:
+            heuristic_fn = octile_distance
+        return _a_star_moves(grid, source, target, heuristic_fn, limit, stats, estimate)
+    
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    workspace = _workspace_for(grid, workspace)
+    generation = workspace.begin()
+    closed_stamp = generation + 1
+    stamps = workspace.stamps
+    g_score = workspace.g_score
+    parents = workspace.parents
+    directions = list(enumerate(offsets))
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    
+    g_score[source] = 0
+    stamps[source] = generation
+    source_row, source_col = divmod(source, stride)
+    if estimate is None:
+        start_h = abs(source_row - end_row) + abs(source_col - end_col)
+    else:
+        start_h = estimate(source)
+    open_set = [(start_h << _F_SHIFT) | (_NODE_MASK << _G_SHIFT) | source]
+    open_count = 1
     visited_count = 0
-    visited_set = set()
+    heap_peak = 1
+    reopened = 0
     
     while open_set:
-        current_f, current = heapq.heappop(open_set)
+        current = heappop(open_set) & _NODE_MASK
         
-        if current in visited_set:
+        if stamps[current] == closed_stamp:
             continue
         
-        visited_set.add(current)
+        stamps[current] = closed_stamp
+        open_count -= 1
         visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
         
-        if current == end:
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = parent[node]
-            return path[::-1], visited_count
+        if current == target:
+            pushes = open_count + visited_count + reopened
+            return _finish(stats, began, (visited_count, pushes, heap_peak, reopened),
+                           _walk_directions, grid, parents, source, target), visited_count
+        if visited_count == limit:
+            _finish(stats, began, (visited_count, open_count + visited_count + reopened, heap_peak, reopened))
+            raise SearchBudgetExceeded(visited_count)
         
-        for neighbor in grid.get_neighbors(current[0], current[1]):
-            new_g = g_score[current] + 1
+        new_g = g_score[current] + 1
+        g_key = (_NODE_MASK - new_g) << _G_SHIFT
+        for direction, offset in directions:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
             
-            if neighbor not in g_score or new_g < g_score[neighbor]:
-                g_score[neighbor] = new_g
-                f_score = new_g + heuristic(neighbor, end)
+            stamp = stamps[neighbor]
+            if stamp < generation:
+                open_count += 1
+            elif stamp == closed_stamp or g_score[neighbor] <= new_g:
+                continue
+            else:
+                reopened += 1
+            stamps[neighbor] = generation
+            g_score[neighbor] = new_g
+            parents[neighbor] = direction
+            if estimate is None:
+                row, col = divmod(neighbor, stride)
+                f_score = new_g + abs(row - end_row) + abs(col - end_col)
+            else:
+                f_score = new_g + estimate(neighbor)
+            heappush(open_set, (f_score << _F_SHIFT) | g_key | neighbor)
+            if on_push is not None:
+                on_push(*grid.coords(neighbor))
+        
+        heap_size = len(open_set)
+        if heap_size > heap_peak:
+            heap_peak = heap_size
+        if heap_size > 2 * open_count + 64:
+            open_set = [entry for entry in open_set
+                        if stamps[entry & _NODE_MASK] == generation and
+                        _NODE_MASK - ((entry >> _G_SHIFT) & _NODE_MASK) == g_score[entry & _NODE_MASK]]
+            heapq.heapify(open_set)
+    
+    return _finish(stats, began, (visited_count, open_count + visited_count + reopened,
+                                  heap_peak, reopened)), visited_count
+
+
+def _join_paths(grid: GridGraph,
+                parent_forward: Dict[int, int],
+                parent_backward: Dict[int, int],
+                forward_node: int,
+                backward_node: int) -> List[Tuple[int, int]]:
+    path = _reconstruct(grid, parent_forward, forward_node)
+    node = backward_node if backward_node != forward_node else parent_backward[backward_node]
+    while node != -1:
+        path.append(grid.coords(node))
+        node = parent_backward[node]
+    return path
+
+
+def _expand_level(cells: bytearray,
+                  offsets: List[int],
+                  frontier: List[int],
+                  parent: Dict[int, int],
+                  distance: Dict[int, int],
+                  other_distance: Dict[int, int],
+                  stats: Optional[SearchStats] = None,
+                  grid: Optional[GridGraph] = None) -> Tuple[List[int], Optional[Tuple[int, int, int]]]:
+    level = distance[frontier[0]] + 1
+    next_frontier = []
+    best = None
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    
+    for current in frontier:
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
+        for offset in offsets:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
+            if neighbor in other_distance:
+                cost = level + other_distance[neighbor]
+                if best is None or cost < best[0]:
+                    best = (cost, current, neighbor)
+            if neighbor not in parent:
                 parent[neighbor] = current
-                heapq.heappush(open_set, (f_score, neighbor))
+                distance[neighbor] = level
+                next_frontier.append(neighbor)
+                if on_push is not None:
+                    on_push(*grid.coords(neighbor))
     
-    return None, visited_count
+    return next_frontier, best
 
-def heuristic(pos: Tuple[int, int], end: Tuple[int, int]) -> int:
-    """Манхэттенское расстояние"""
-    return abs(pos[0] - end[0]) + abs(pos[1] - end[1])
 
+def bidirectional_bfs(grid: GridGraph,
+                      start: Tuple[int, int],
+                      end: Tuple[int, int],
+                      stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """
+    BFS одновременно от start и от end, каждый шаг расширяет меньший фронт.
+    Только для 4-связной сетки.
+    Возвращает: (путь, количество посещённых клеток)
+    """
+    
+    if grid.connectivity != 4:
+        raise ValueError("Bidirectional BFS supports 4-connected grids only")
+    
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        return None, 0
+    
+    if start == end:
+        return [start], 1
+    
+    if grid.unreachable(start, end):
+        return None, 0
+    
+    cells = grid.cells
+    offsets = grid.offsets
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    
+    parent_forward = {source: -1}
+    parent_backward = {target: -1}
+    distance_forward = {source: 0}
+    distance_backward = {target: 0}
+    frontier_forward = [source]
+    frontier_backward = [target]
+    visited_count = 0
+    began = _start_clock(stats)
+    frontier_peak = 2
+    
+    while frontier_forward and frontier_backward:
+        frontier_peak = max(frontier_peak, len(frontier_forward) + len(frontier_backward))
+        if len(frontier_forward) <= len(frontier_backward):
+            visited_count += len(frontier_forward)
+            frontier_forward, meet = _expand_level(cells, offsets, frontier_forward,
+                                                   parent_forward, distance_forward,
+                                                   distance_backward, stats, grid)
+            if meet is not None:
+                _, forward_node, backward_node = meet
+                return _finish(stats, began, (visited_count, len(parent_forward) + len(parent_backward),
+                                              frontier_peak, 0),
+                               _join_paths, grid, parent_forward, parent_backward,
+                               forward_node, backward_node), visited_count
+        else:
+            visited_count += len(frontier_backward)
+            frontier_backward, meet = _expand_level(cells, offsets, frontier_backward,
+                                                    parent_backward, distance_backward,
+                                                    distance_forward, stats, grid)
+            if meet is not None:
+                _, backward_node, forward_node = meet
+                return _finish(stats, began, (visited_count, len(parent_forward) + len(parent_backward),
+                                              frontier_peak, 0),
+                               _join_paths, grid, parent_forward, parent_backward,
+                               forward_node, backward_node), visited_count
+    
+    _finish(stats, began, (visited_count, len(parent_forward) + len(parent_backward), frontier_peak, 0))
+    return None, visited_count
 
-def a_star_shortest_path(grid: GridGraph, 
-                         start: Tuple[int, int], 
-                         end: Tuple[int, int]) -> Optional[Tuple[List[Tuple[int, int]], int]]:
+
+def bidirectional_a_star(grid: GridGraph,
+                         start: Tuple[int, int],
+                         end: Tuple[int, int],
+                         stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
     """
-    A* алгоритм поиска кратчайшего пути.
+    Двунаправленный A* с манхэттенской эвристикой к противоположному концу.
+    Останавливается, когда лучший найденный путь не длиннее max(min f) обеих очередей.
+    Только для 4-связной сетки.
     Возвращает: (путь, количество посещённых клеток)
     """
     
+    if grid.connectivity != 4:
+        raise ValueError("Bidirectional A* supports 4-connected grids only")
+    
     if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
         return None, 0
     
     if start == end:
         return [start], 1
     
-    open_set = [(0, start)]
-    parent = {start: None}
-    g_score = {start: 0} 
+    if grid.unreachable(start, end):
+        return None, 0
+    
+    cells = grid.cells
+    offsets = grid.offsets
+    stride = grid.stride
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    source_row, source_col = divmod(source, stride)
+    target_row, target_col = divmod(target, stride)
+    initial_h = abs(source_row - target_row) + abs(source_col - target_col)
+    
+    open_forward = [(initial_h, source)]
+    open_backward = [(initial_h, target)]
+    g_forward = {source: 0}
+    g_backward = {target: 0}
+    parent_forward = {source: -1}
+    parent_backward = {target: -1}
+    closed_forward = set()
+    closed_backward = set()
+    best = -1
+    meet = -1
     visited_count = 0
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    pushes = 2
+    heap_peak = 2
+    reopened = 0
     
-    while open_set:
+    while open_forward and open_backward:
+        if best != -1 and best <= max(open_forward[0][0], open_backward[0][0]):
+            break
+        heap_peak = max(heap_peak, len(open_forward) + len(open_backward))
+        
+        if len(open_forward) <= len(open_backward):
+            open_set, g_score, parent, closed = open_forward, g_forward, parent_forward, closed_forward
+            other_g = g_backward
+            goal_row, goal_col = target_row, target_col
+        else:
+            open_set, g_score, parent, closed = open_backward, g_backward, parent_backward, closed_backward
+            other_g = g_forward
+            goal_row, goal_col = source_row, source_col
+        
         current_f, current = heapq.heappop(open_set)
+        if current in closed:
+            continue
+        closed.add(current)
         visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
         
-        if current == end:
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = parent[node]
-            return path[::-1], visited_count
-        
-        for neighbor in grid.get_neighbors(current[0], current[1]):
-            new_g = g_score[current] + 1
+        new_g = g_score[current] + 1
+        for offset in offsets:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
             
             if neighbor not in g_score or new_g < g_score[neighbor]:
+                if neighbor in g_score:
+                    reopened += 1
                 g_score[neighbor] = new_g
-                f_score = new_g + heuristic(neighbor, end)
                 parent[neighbor] = current
-                heapq.heappush(open_set, (f_score, neighbor))
+                row, col = divmod(neighbor, stride)
+                heapq.heappush(open_set, (new_g + abs(row - goal_row) + abs(col - goal_col), neighbor))
+                pushes += 1
+                if on_push is not None:
+                    on_push(row - 1, col - 1)
+                if neighbor in other_g and (best == -1 or new_g + other_g[neighbor] < best):
+                    best = new_g + other_g[neighbor]
+                    meet = neighbor
     
-    return None, visited_count
+    counters = (visited_count, pushes, heap_peak, reopened)
+    if meet == -1:
+        return _finish(stats, began, counters), visited_count
+    
+    return _finish(stats, began, counters,
+                   _join_paths, grid, parent_forward, parent_backward, meet, meet), visited_count
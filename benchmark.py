@@ -0,0 +1,250 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithm import (GridGraph, SearchStats, a_star_shortest_path, bfs_shortest_path,
+                       bidirectional_a_star, bidirectional_bfs)
+from hierarchical import HierarchicalGraph, hpa_star_shortest_path
+from jump_point import jump_point_search
+from generators import generate
+from landmarks import LandmarkOracle, alt_shortest_path
+from parallel import throughput
+from weighted import dijkstra_shortest_path, weighted_a_star_shortest_path
+
+
+SIZES = (100, 250, 500, 1000, 2000, 4000)
+DENSITIES = (0.1, 0.2, 0.3, 0.4)
+DEFAULT_THRESHOLD = 0.15
+
+
+# Семейство карт: генератор из generators, его параметры и нужна ли гарантия
+# пути между углами (для семейств, не связных по построению)
+FAMILIES: Dict[str, Tuple[str, Dict[str, Any], bool]] = {
+    "open": ("open", {}, False),
+    **{f"random-{round(density * 100)}": ("random", {"density": density}, False) for density in DENSITIES},
+    "maze": ("backtracker", {}, False),
+    "rooms": ("room-grid", {}, False),
+    "spiral": ("spiral", {}, False),
+    "cave": ("cave", {}, True),
+    "division": ("division", {}, False),
+    "dungeon": ("dungeon", {}, True),
+}
+
+
+def _plain(search: Callable) -> Tuple[Callable[[GridGraph], Any], Callable]:
+    return (lambda grid: grid), search
+
+
+ALGORITHMS: Dict[str, Tuple[Callable[[GridGraph], Any], Callable]] = {
+    "bfs": _plain(bfs_shortest_path),
+    "a_star": _plain(a_star_shortest_path),
+    "bidirectional_bfs": _plain(bidirectional_bfs),
+    "bidirectional_a_star": _plain(bidirectional_a_star),
+    "jps": _plain(jump_point_search),
+    "dijkstra": _plain(dijkstra_shortest_path),
+    "weighted_a_star": _plain(weighted_a_star_shortest_path),
+    "hpa": (HierarchicalGraph, hpa_star_shortest_path),
+    "alt": (LandmarkOracle, alt_shortest_path),
+}
+
+
+def build_map(family: str, size: int, seed: int = 0) -> GridGraph:
+    """Карта семейства family; одинаковые (family, size, seed) дают одинаковую карту"""
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown map family {family!r}, expected one of {sorted(FAMILIES)}")
+    kind, params, connected = FAMILIES[family]
+    connect = ((0, 0), (size - 1, size - 1)) if connected else None
+    return generate(kind, size, size, seed=f"{family}/{size}/{seed}", connect=connect, **params)
+
+
+def _nearest_free(grid: GridGraph, row: int, col: int) -> Optional[Tuple[int, int]]:
+    for radius in range(grid.rows + grid.cols):
+        for dr in range(-radius, radius + 1):
+            for dc in {radius - abs(dr), abs(dr) - radius}:
+                if grid.is_valid(row + dr, col + dc):
+                    return row + dr, col + dc
+    return None
+
+
+def make_queries(grid: GridGraph, count: int, seed: int = 0) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Первый запрос - между свободными клетками у противоположных углов, остальные случайные"""
+    first = _nearest_free(grid, 0, 0)
+    if first is None or count < 1:
+        return []
+    queries = [(first, _nearest_free(grid, grid.rows - 1, grid.cols - 1))]
+    rng = random.Random(seed)
+    while len(queries) < count:
+        start = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        end = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        if grid.is_valid(start[0], start[1]) and grid.is_valid(end[0], end[1]):
+            queries.append((start, end))
+    return queries
+
+
+def measure(search: Callable, context: Any,
+            queries: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+            measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Суммарные время, счётчики SearchStats и длины путей по запросам. Время
+    меряется без tracemalloc; пиковая память - отдельным прогоном под tracemalloc.
+    """
+
+    time_ms = 0.0
+    stats = SearchStats()
+    path_length = 0
+    found = 0
+    for start, end in queries:
+        began = time.perf_counter()
+        result = search(context, start, end, stats=stats)
+        time_ms += (time.perf_counter() - began) * 1000
+        path = result[0] if isinstance(result, tuple) else result
+        if path is not None:
+            found += 1
+            path_length += len(path)
+
+    peak_kib = None
+    if measure_memory:
+        peak = 0
+        for start, end in queries:
+            tracemalloc.start()
+            search(context, start, end)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        peak_kib = round(peak / 1024, 1)
+
+    return {"time_ms": round(time_ms, 3), "expanded": stats.expanded, "pushes": stats.pushes,
+            "heap_peak": stats.heap_peak, "reopened": stats.reopened,
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in stats.timings.items()},
+            "peak_kib": peak_kib, "path_length": path_length, "found": found}
+
+
+def run_benchmark(sizes: Sequence[int] = SIZES,
+                  families: Sequence[str] = tuple(FAMILIES),
+                  algorithms: Sequence[str] = tuple(ALGORITHMS),
+                  queries: int = 5,
+                  seed: int = 0,
+                  measure_memory: bool = True,
+                  workers: Sequence[int] = (),
+                  log: Optional[Callable[[str], None]] = print) -> Dict[str, Any]:
+    """
+    Прогон всех алгоритмов на всех картах. Результат - словарь, готовый
+    к записи в JSON: meta и results, по записи на (семейство, размер,
+    алгоритм) с суммами по запросам. workers - размеры пула для замера
+    пропускной способности BatchSolver (запись "a_star@Nw").
+    """
+
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {name!r}, expected one of {sorted(ALGORITHMS)}")
+
+    results = []
+    for size in sizes:
+        for family in families:
+            began = time.perf_counter()
+            grid = build_map(family, size, seed)
+            build_ms = (time.perf_counter() - began) * 1000
+            pairs = make_queries(grid, queries, seed)
+            for name in algorithms:
+                prepare, search = ALGORITHMS[name]
+                began = time.perf_counter()
+                context = prepare(grid)
+                prepare_ms = (time.perf_counter() - began) * 1000
+                entry = {"family": family, "size": size, "algorithm": name, "queries": len(pairs),
+                         "build_ms": round(build_ms, 3), "prepare_ms": round(prepare_ms, 3),
+                         **measure(search, context, pairs, measure_memory)}
+                results.append(entry)
+                if log:
+                    log(f"{family:>10} {size:>5} {name:>20}: {entry['time_ms']:10.1f} ms  "
+                        f"expanded {entry['expanded']}  peak {entry['peak_kib']} KiB")
+            for count in workers:
+                batch = pairs * max(1, 64 // max(1, len(pairs)))
+                qps = throughput(grid, batch, count) if batch else 0.0
+                results.append({"family": family, "size": size, "algorithm": f"a_star@{count}w",
+                                "queries": len(batch), "throughput_qps": round(qps, 1)})
+                if log:
+                    log(f"{family:>10} {size:>5} {'a_star@' + str(count) + 'w':>20}: {qps:10.1f} queries/s")
+
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "seed": seed, "queries": queries, "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def _key(entry: Dict[str, Any]) -> str:
+    return f"{entry['family']}/{entry['size']}/{entry['algorithm']}"
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Регрессии относительно baseline: время или пиковая память выросли больше
+    чем на threshold, пропускная способность упала больше чем на threshold,
+    раскрытий стало больше или изменилась суммарная длина путей.
+    """
+
+    previous = {_key(entry): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        key = _key(entry)
+        old = previous.get(key)
+        if old is None:
+            continue
+        for field in ("time_ms", "peak_kib"):
+            if entry.get(field) is not None and old.get(field):
+                change = entry[field] / old[field] - 1
+                if change > threshold:
+                    regressions.append(f"{key}: {field} {old[field]} -> {entry[field]} (+{change:.0%})")
+        if entry.get("throughput_qps") is not None and old.get("throughput_qps"):
+            change = 1 - entry["throughput_qps"] / old["throughput_qps"]
+            if change > threshold:
+                regressions.append(f"{key}: throughput_qps {old['throughput_qps']} -> "
+                                   f"{entry['throughput_qps']} (-{change:.0%})")
+        if entry.get("expanded") is not None and old.get("expanded") is not None \
+                and entry["expanded"] > old["expanded"]:
+            regressions.append(f"{key}: expanded {old['expanded']} -> {entry['expanded']}")
+        if entry.get("path_length") is not None and old.get("path_length") is not None \
+                and entry["path_length"] != old["path_length"]:
+            regressions.append(f"{key}: path_length {old['path_length']} -> {entry['path_length']}")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pathfinding benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--families", nargs="+", default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="*", default=[])
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak measurement")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against results JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    arguments = parser.parse_args(argv)
+
+    report = run_benchmark(arguments.sizes, arguments.families, arguments.algorithms,
+                           queries=arguments.queries, seed=arguments.seed,
+                           measure_memory=not arguments.no_memory, workers=arguments.workers)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            regressions = compare(report, json.load(file), arguments.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
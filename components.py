@@ -0,0 +1,165 @@
+from array import array
+from typing import List, Tuple
+
+from algorithm import GridGraph
+
+
+class ComponentIndex:
+    """
+    Разметка связных компонент свободных клеток. После создания индекс
+    подключается к сетке (grid.components), и все поиски сразу возвращают
+    "нет пути", если start и end лежат в разных компонентах.
+    Освобождение клетки обрабатывается объединением меток (union-find),
+    блокировка - проверкой кольца из 8 соседних клеток: если свободные
+    ортогональные соседи связаны через кольцо, компонента не распалась.
+    Иначе разметка пересчитывается при следующем запросе.
+    Диагональный ход всегда требует свободной ортогональной клетки рядом,
+    поэтому компоненты 8-связной сетки совпадают с 4-связными, и индекс
+    строится только по ортогональным смещениям.
+    """
+
+    def __init__(self, grid: GridGraph):
+
+        self.grid = grid
+        self.labels = array('i')
+        self.parent: List[int] = []
+        self.sizes: List[int] = []
+        self.dirty = True
+        stride = grid.stride
+        self.ring = [-stride, -stride + 1, 1, stride + 1, stride, stride - 1, -1, -stride - 1]
+        self.rebuild()
+        grid.components = self
+        grid.listeners.append(self._on_cell_changed)
+
+    def detach(self) -> None:
+        """Отключение индекса от сетки"""
+        if self.grid.components is self:
+            self.grid.components = None
+        if self._on_cell_changed in self.grid.listeners:
+            self.grid.listeners.remove(self._on_cell_changed)
+
+    def rebuild(self) -> None:
+        """Полная разметка обходом в ширину по буферу сетки"""
+
+        grid = self.grid
+        cells = grid.cells
+        offsets = grid.offsets
+        labels = array('i', [-1]) * grid.size
+        self.parent = []
+        self.sizes = []
+
+        for origin in range(grid.size):
+            if not cells[origin] or labels[origin] >= 0:
+                continue
+            label = len(self.parent)
+            labels[origin] = label
+            frontier = [origin]
+            count = 1
+            while frontier:
+                next_frontier = []
+                for current in frontier:
+                    for offset in offsets:
+                        neighbor = current + offset
+                        if cells[neighbor] and labels[neighbor] < 0:
+                            labels[neighbor] = label
+                            next_frontier.append(neighbor)
+                count += len(next_frontier)
+                frontier = next_frontier
+            self.parent.append(label)
+            self.sizes.append(count)
+
+        self.labels = labels
+        self.dirty = False
+
+    def _find(self, label: int) -> int:
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def _union(self, a: int, b: int) -> int:
+        a = self._find(a)
+        b = self._find(b)
+        if a == b:
+            return a
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.sizes[a] += self.sizes[b]
+        return a
+
+    def _ring_connected(self, index: int) -> bool:
+        cells = self.grid.cells
+        free = [cells[index + offset] for offset in self.ring]
+        if all(free):
+            return True
+        first_blocked = free.index(0)
+        runs = set()
+        run = 0
+        for step in range(1, 9):
+            position = (first_blocked + step) % 8
+            if not free[position]:
+                run += 1
+            elif position % 2 == 0:
+                runs.add(run)
+        return len(runs) <= 1
+
+    def _on_cell_changed(self, row: int, col: int) -> None:
+        if self.dirty:
+            return
+
+        cells = self.grid.cells
+        labels = self.labels
+        index = self.grid.index(row, col)
+        if cells[index]:
+            label = -1
+            for offset in self.grid.offsets:
+                neighbor_label = labels[index + offset]
+                if neighbor_label < 0:
+                    continue
+                label = neighbor_label if label < 0 else self._union(label, neighbor_label)
+            if label < 0:
+                label = len(self.parent)
+                self.parent.append(label)
+                self.sizes.append(0)
+            root = self._find(label)
+            labels[index] = root
+            self.sizes[root] += 1
+        else:
+            root = self._find(labels[index])
+            labels[index] = -1
+            self.sizes[root] -= 1
+            if not self._ring_connected(index):
+                self.dirty = True
+
+    def label_of(self, row: int, col: int) -> int:
+        """Метка компоненты клетки; -1 для препятствий и клеток вне сетки"""
+        if not (0 <= row < self.grid.rows and 0 <= col < self.grid.cols):
+            return -1
+        if self.dirty:
+            self.rebuild()
+        label = self.labels[self.grid.index(row, col)]
+        return self._find(label) if label >= 0 else -1
+
+    def connected(self, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+        label = self.label_of(start[0], start[1])
+        return label >= 0 and label == self.label_of(end[0], end[1])
+
+    def component_size(self, row: int, col: int) -> int:
+        label = self.label_of(row, col)
+        return self.sizes[label] if label >= 0 else 0
+
+    def largest(self) -> int:
+        """Метка наибольшей компоненты; -1, если свободных клеток нет"""
+        if self.dirty:
+            self.rebuild()
+        roots = [label for label, parent in enumerate(self.parent) if label == parent and self.sizes[label] > 0]
+        return max(roots, key=self.sizes.__getitem__) if roots else -1
+
+    def cells_of(self, label: int) -> List[int]:
+        """Индексы буфера клеток компоненты label"""
+        if self.dirty:
+            self.rebuild()
+        find = self._find
+        return [index for index, own in enumerate(self.labels) if own >= 0 and find(own) == label]
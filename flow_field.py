@@ -0,0 +1,221 @@
+from array import array
+from typing import List, Optional, Tuple
+import heapq
+
+from algorithm import GridGraph, _corner_open
+
+
+UNREACHABLE = -1.0
+NO_DIRECTION = -1
+
+
+class FlowField:
+    """
+    Поле потока к одной цели для множества агентов: обратное поле расстояний
+    от goal строится один раз, после чего следующий шаг из любой клетки
+    берётся за O(1). distances - стоимость пути до goal по индексам буфера
+    (UNREACHABLE, если пути нет), directions - массив int8 с номером хода
+    из grid.moves (и grid.directions) к цели, NO_DIRECTION у цели и у
+    недостижимых клеток.
+    Стоимость хода - его цена из grid.moves, умноженная на стоимость
+    входимой клетки, если у сетки есть слой стоимостей; для 4-связной сетки
+    без стоимостей поле строится BFS по уровням.
+    Поле подписано на add_obstacle/remove_obstacle: перед запросом
+    пересчитываются только клетки, чей путь шёл через изменённые клетки.
+    Изменение слоя стоимостей обнаруживается по grid.cost_version и ведёт
+    к полному построению поля.
+    rebuild_share - доля сброшенных клеток сетки, начиная с которой полное
+    построение выгоднее починки (1.0 - всегда чинить).
+    """
+
+    REBUILD_SHARE = 0.1
+
+    def __init__(self, grid: GridGraph, goal: Tuple[int, int], rebuild_share: float = REBUILD_SHARE):
+
+        if not 0 <= rebuild_share <= 1:
+            raise ValueError(f"Rebuild share must be in 0..1, got {rebuild_share}")
+
+        self.grid = grid
+        self.goal = goal
+        self.rebuild_share = rebuild_share
+        self.target = grid.index(goal[0], goal[1])
+        self.pending: List[int] = []
+        self.rebuild()
+        grid.listeners.append(self._on_cell_changed)
+
+    def detach(self) -> None:
+        """Отписка от изменений сетки"""
+        if self._on_cell_changed in self.grid.listeners:
+            self.grid.listeners.remove(self._on_cell_changed)
+
+    def _on_cell_changed(self, row: int, col: int) -> None:
+        self.pending.append(self.grid.index(row, col))
+
+    def rebuild(self) -> None:
+        """Полное построение поля"""
+
+        grid = self.grid
+        self.distances = array('d', [UNREACHABLE]) * grid.size
+        self.directions = array('b', [NO_DIRECTION]) * grid.size
+        self.cost_version = grid.cost_version
+        self.pending = []
+        if not grid.cells[self.target]:
+            return
+
+        self.distances[self.target] = 0
+        if grid.connectivity == 4 and grid.costs is None:
+            self._levels()
+        else:
+            self._propagate([(0, self.target)])
+
+    def _levels(self) -> None:
+        cells = self.grid.cells
+        distances = self.distances
+        directions = self.directions
+        reverse = [(direction, -offset) for direction, offset in enumerate(self.grid.offsets)]
+        frontier = [self.target]
+        level = 0
+        while frontier:
+            level += 1
+            next_frontier = []
+            push = next_frontier.append
+            for current in frontier:
+                for direction, offset in reverse:
+                    neighbor = current + offset
+                    if cells[neighbor] and distances[neighbor] < 0:
+                        distances[neighbor] = level
+                        directions[neighbor] = direction
+                        push(neighbor)
+            frontier = next_frontier
+
+    def _propagate(self, heap: List[Tuple[float, int]]) -> None:
+        # Дейкстра от цели: из current шагом move приходит клетка current - offset
+        grid = self.grid
+        cells = grid.cells
+        costs = grid.costs
+        corner_cutting = grid.corner_cutting
+        distances = self.distances
+        directions = self.directions
+        moves = list(enumerate(grid.moves))
+        heapq.heapify(heap)
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if distance > distances[current]:
+                continue
+            step = costs[current] if costs is not None else 1
+            for direction, (offset, cost, side_a, side_b) in moves:
+                neighbor = current - offset
+                if not cells[neighbor]:
+                    continue
+                if side_b and not _corner_open(cells, neighbor, side_a, side_b, corner_cutting):
+                    continue
+                candidate = distance + cost * step
+                if distances[neighbor] < 0 or candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    directions[neighbor] = direction
+                    heapq.heappush(heap, (candidate, neighbor))
+
+    def refresh(self) -> int:
+        """
+        Учёт изменений сетки. Клетки, чей путь к цели проходил через
+        изменённые клетки (для 8-связной сетки - и через их соседей, так как
+        от клетки зависят диагональные ходы рядом), сбрасываются и
+        получают расстояния от соседей с верными значениями; затем Дейкстра
+        распространяет и улучшения, например через освобождённую клетку.
+        Возвращает число сброшенных клеток (размер сетки при полной перестройке).
+        """
+
+        grid = self.grid
+        if grid.cost_version != self.cost_version or self.target in self.pending:
+            self.rebuild()
+            return grid.size
+        if not self.pending:
+            return 0
+
+        cells = grid.cells
+        costs = grid.costs
+        distances = self.distances
+        directions = self.directions
+        moves = list(enumerate(grid.moves))
+        changed = set(self.pending)
+        self.pending = []
+        if grid.connectivity == 8:
+            # Клетка - сторона диагональных ходов между её соседями
+            changed.update([node + offset for node in list(changed) for offset, _, _, _ in grid.moves
+                            if cells[node + offset] and node + offset != self.target])
+
+        stack = list(changed)
+        invalid = set()
+        while stack:
+            current = stack.pop()
+            if current in invalid:
+                continue
+            invalid.add(current)
+            for direction, (offset, _, _, _) in moves:
+                child = current - offset
+                if directions[child] == direction and child not in invalid:
+                    stack.append(child)
+        if len(invalid) > grid.size * self.rebuild_share:
+            self.rebuild()
+            return grid.size
+        for node in invalid:
+            distances[node] = UNREACHABLE
+            directions[node] = NO_DIRECTION
+
+        corner_cutting = grid.corner_cutting
+        heap = []
+        for node in invalid:
+            if not cells[node]:
+                continue
+            best = UNREACHABLE
+            for direction, (offset, cost, side_a, side_b) in moves:
+                neighbor = node + offset
+                if not cells[neighbor] or distances[neighbor] < 0:
+                    continue
+                if side_b and not _corner_open(cells, node, side_a, side_b, corner_cutting):
+                    continue
+                candidate = distances[neighbor] + cost * (costs[neighbor] if costs is not None else 1)
+                if best < 0 or candidate < best:
+                    best = candidate
+                    directions[node] = direction
+            if best >= 0:
+                distances[node] = best
+                heap.append((best, node))
+        self._propagate(heap)
+        return len(invalid)
+
+    def direction(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        """Шаг (dr, dc) к цели из клетки; None у цели, вне сетки и без пути"""
+        if self.pending or self.grid.cost_version != self.cost_version:
+            self.refresh()
+        if not (0 <= row < self.grid.rows and 0 <= col < self.grid.cols):
+            return None
+        direction = self.directions[self.grid.index(row, col)]
+        return self.grid.directions[direction] if direction != NO_DIRECTION else None
+
+    def next_cell(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        step = self.direction(row, col)
+        return (row + step[0], col + step[1]) if step is not None else None
+
+    def distance(self, row: int, col: int) -> Optional[float]:
+        """Стоимость пути до цели; None, если пути нет"""
+        if self.pending or self.grid.cost_version != self.cost_version:
+            self.refresh()
+        if not (0 <= row < self.grid.rows and 0 <= col < self.grid.cols):
+            return None
+        distance = self.distances[self.grid.index(row, col)]
+        return distance if distance >= 0 else None
+
+    def path(self, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Полный путь от start до цели по направлениям поля"""
+        if self.distance(start[0], start[1]) is None:
+            return None
+        grid = self.grid
+        moves = grid.moves
+        directions = self.directions
+        node = grid.index(start[0], start[1])
+        path = [start]
+        while node != self.target:
+            node += moves[directions[node]][0]
+            path.append(grid.coords(node))
+        return path
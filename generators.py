@@ -0,0 +1,282 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import random
+import sys
+
+from algorithm import GridGraph, bfs_distance_field
+
+
+_DIGITS = bytes.maketrans(bytes([GridGraph.BLOCKED, GridGraph.FREE]), b"01")
+_CELLS = bytes.maketrans(b"01", bytes([GridGraph.BLOCKED, GridGraph.FREE]))
+# Старший байт int32 из поля расстояний: 0xff у -1 (не достигнута), иначе < 0x80
+_REACHED = bytes(GridGraph.FREE if byte < 0x80 else GridGraph.BLOCKED for byte in range(256))
+_SIGN_BYTE = 3 if sys.byteorder == "little" else 0
+
+
+def _to_bits(cells) -> int:
+    """Буфер cells как битовое множество: бит i - клетка с индексом i свободна"""
+    return int(bytes(cells).translate(_DIGITS)[::-1], 2)
+
+
+def _from_bits(bits: int, size: int) -> bytes:
+    return bin(bits)[2:].zfill(size)[::-1].encode().translate(_CELLS)
+
+
+def _interior(grid: GridGraph) -> int:
+    return _to_bits(GridGraph(grid.rows, grid.cols).cells)
+
+
+def _fill_row(grid: GridGraph, row: int, left: int, right: int, value: int) -> None:
+    base = grid.index(row, 0)
+    grid.cells[base + left:base + right + 1] = bytes([value]) * (right - left + 1)
+
+
+def _fill_col(grid: GridGraph, col: int, top: int, bottom: int, value: int) -> None:
+    stride = grid.stride
+    start = grid.index(top, col)
+    grid.cells[start:start + (bottom - top) * stride + 1:stride] = bytes([value]) * (bottom - top + 1)
+
+
+def open_map(rows: int, cols: int, rng: random.Random) -> GridGraph:
+    return GridGraph(rows, cols)
+
+
+def random_map(rows: int, cols: int, rng: random.Random, density: float = 0.2) -> GridGraph:
+    """Независимые препятствия с вероятностью density, строка за одну запись"""
+    table = bytes(GridGraph.BLOCKED if value < density * 256 else GridGraph.FREE for value in range(256))
+    grid = GridGraph(rows, cols)
+    for row in range(rows):
+        base = grid.index(row, 0)
+        grid.cells[base:base + cols] = rng.randbytes(cols).translate(table)
+    return grid
+
+
+def cave_map(rows: int, cols: int, rng: random.Random, fill: float = 0.45, steps: int = 4) -> GridGraph:
+    """
+    Пещеры клеточным автоматом: случайное заполнение fill, затем steps
+    шагов правила "стена, если стен в окрестности 3x3 не меньше пяти"
+    (за краем сетки - стены). Шаг считается над всей сеткой сразу как над
+    битовым множеством: девять сдвигов суммируются побитовыми сумматорами.
+    """
+
+    grid = random_map(rows, cols, rng, density=fill)
+    stride = grid.stride
+    everything = (1 << grid.size) - 1
+    interior = _interior(grid)
+    walls = everything & ~_to_bits(grid.cells)
+    shifts = [dr * stride + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+    for _ in range(steps):
+        ones = twos = fours = eights = 0
+        for shift in shifts:
+            value = (walls << shift if shift > 0 else walls >> -shift) & everything
+            carry = ones & value
+            ones ^= value
+            carry, twos = twos & carry, twos ^ carry
+            carry, fours = fours & carry, fours ^ carry
+            eights |= carry
+        walls = (eights | (fours & (twos | ones)) | ~interior) & everything
+
+    grid.cells[:] = _from_bits(interior & ~walls, grid.size)
+    return grid
+
+
+def division_maze(rows: int, cols: int, rng: random.Random) -> GridGraph:
+    """
+    Лабиринт рекурсивным делением: камера делится стеной на нечётной
+    строке или столбце с одним проходом на чётной позиции, стены пишутся
+    срезами буфера. Проходы на чётных координатах; все свободные клетки
+    связаны.
+    """
+
+    grid = GridGraph(rows, cols)
+    chambers = [(0, 0, rows - 1, cols - 1)]
+    while chambers:
+        top, left, bottom, right = chambers.pop()
+        height = bottom - top
+        width = right - left
+        if height < 2 and width < 2:
+            continue
+        horizontal = height > width or (height == width and rng.random() < 0.5)
+        if horizontal and height >= 2:
+            wall = top + 1 + 2 * rng.randrange(height // 2)
+            _fill_row(grid, wall, left, right, GridGraph.BLOCKED)
+            gap = left + 2 * rng.randrange(width // 2 + 1)
+            grid.cells[grid.index(wall, gap)] = GridGraph.FREE
+            chambers.append((top, left, wall - 1, right))
+            chambers.append((wall + 1, left, bottom, right))
+        elif width >= 2:
+            wall = left + 1 + 2 * rng.randrange(width // 2)
+            _fill_col(grid, wall, top, bottom, GridGraph.BLOCKED)
+            gap = top + 2 * rng.randrange(height // 2 + 1)
+            grid.cells[grid.index(gap, wall)] = GridGraph.FREE
+            chambers.append((top, left, bottom, wall - 1))
+            chambers.append((top, wall + 1, bottom, right))
+    return grid
+
+
+def backtracker_maze(rows: int, cols: int, rng: random.Random) -> GridGraph:
+    """Лабиринт поиском в глубину: комнаты в клетках с чётными координатами"""
+    grid = GridGraph(rows, cols)
+    cells = grid.cells
+    for row in range(rows):
+        base = grid.index(row, 0)
+        cells[base:base + cols] = bytes(cols)
+    steps = ((-2, 0), (2, 0), (0, -2), (0, 2))
+    cells[grid.index(0, 0)] = GridGraph.FREE
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in steps
+                   if 0 <= row + dr < rows and 0 <= col + dc < cols
+                   and not cells[grid.index(row + dr, col + dc)]]
+        if not options:
+            stack.pop()
+            continue
+        new_row, new_col = rng.choice(options)
+        cells[grid.index((row + new_row) // 2, (col + new_col) // 2)] = GridGraph.FREE
+        cells[grid.index(new_row, new_col)] = GridGraph.FREE
+        stack.append((new_row, new_col))
+    return grid
+
+
+def dungeon_map(rows: int, cols: int, rng: random.Random,
+                rooms: Optional[int] = None, min_room: int = 3, max_room: Optional[int] = None) -> GridGraph:
+    """
+    Комнаты и коридоры: до rooms непересекающихся прямоугольных комнат
+    на сплошном камне, каждая соединена с предыдущей Г-образным коридором
+    между центрами. Все свободные клетки связаны.
+    """
+
+    grid = GridGraph(rows, cols)
+    for row in range(rows):
+        _fill_row(grid, row, 0, cols - 1, GridGraph.BLOCKED)
+    if rooms is None:
+        rooms = max(2, rows * cols // 150)
+    if max_room is None:
+        max_room = max(min_room, min(rows, cols) // 6)
+
+    placed = []
+    for _ in range(4 * rooms):
+        if len(placed) == rooms:
+            break
+        height = min(rows, rng.randint(min_room, max_room))
+        width = min(cols, rng.randint(min_room, max_room))
+        top = rng.randrange(rows - height + 1)
+        left = rng.randrange(cols - width + 1)
+        if any(top <= other_bottom + 1 and other_top <= top + height and
+               left <= other_right + 1 and other_left <= left + width
+               for other_top, other_left, other_bottom, other_right in placed):
+            continue
+        placed.append((top, left, top + height - 1, left + width - 1))
+        for row in range(top, top + height):
+            _fill_row(grid, row, left, left + width - 1, GridGraph.FREE)
+
+    centers = [((top + bottom) // 2, (left + right) // 2) for top, left, bottom, right in placed]
+    for (row_a, col_a), (row_b, col_b) in zip(centers, centers[1:]):
+        _fill_row(grid, row_a, min(col_a, col_b), max(col_a, col_b), GridGraph.FREE)
+        _fill_col(grid, col_b, min(row_a, row_b), max(row_a, row_b), GridGraph.FREE)
+    return grid
+
+
+def room_grid(rows: int, cols: int, rng: random.Random) -> GridGraph:
+    """Прямоугольные комнаты сеткой, в каждой стене между соседними комнатами одна дверь"""
+    grid = GridGraph(rows, cols)
+    cells = grid.cells
+    room = max(4, min(rows, cols) // 20)
+    for wall in range(room, rows, room):
+        _fill_row(grid, wall, 0, cols - 1, GridGraph.BLOCKED)
+    for wall in range(room, cols, room):
+        _fill_col(grid, wall, 0, rows - 1, GridGraph.BLOCKED)
+    along_rows = list(range(0, cols, room)) + [cols]
+    along_cols = list(range(0, rows, room)) + [rows]
+    for wall in range(room, max(rows, cols), room):
+        for segment in range(max(len(along_rows), len(along_cols)) - 1):
+            if wall < rows and segment < len(along_rows) - 1:
+                low, high = along_rows[segment], along_rows[segment + 1]
+                if high - low > 1:
+                    cells[grid.index(wall, rng.randrange(low + 1 if low else 0, high))] = GridGraph.FREE
+            if wall < cols and segment < len(along_cols) - 1:
+                low, high = along_cols[segment], along_cols[segment + 1]
+                if high - low > 1:
+                    cells[grid.index(rng.randrange(low + 1 if low else 0, high), wall)] = GridGraph.FREE
+    return grid
+
+
+def spiral_map(rows: int, cols: int, rng: random.Random) -> GridGraph:
+    """Вложенные прямоугольные стены через клетку с проходом в чередующихся углах"""
+    grid = GridGraph(rows, cols)
+    for ring, offset in enumerate(range(1, min(rows, cols) // 2, 2)):
+        last_row = rows - 1 - offset
+        last_col = cols - 1 - offset
+        if last_row <= offset or last_col <= offset:
+            break
+        _fill_row(grid, offset, offset, last_col, GridGraph.BLOCKED)
+        _fill_row(grid, last_row, offset, last_col, GridGraph.BLOCKED)
+        _fill_col(grid, offset, offset, last_row, GridGraph.BLOCKED)
+        _fill_col(grid, last_col, offset, last_row, GridGraph.BLOCKED)
+        gap_row, gap_col = ((offset, offset + 1), (last_row - 1, offset),
+                            (last_row, last_col - 1), (offset + 1, last_col))[ring % 4]
+        grid.cells[grid.index(gap_row, gap_col)] = GridGraph.FREE
+    return grid
+
+
+GENERATORS: Dict[str, Callable[..., GridGraph]] = {
+    "open": open_map,
+    "random": random_map,
+    "cave": cave_map,
+    "division": division_maze,
+    "backtracker": backtracker_maze,
+    "dungeon": dungeon_map,
+    "room-grid": room_grid,
+    "spiral": spiral_map,
+}
+CONNECTED = ("open", "division", "backtracker", "dungeon", "room-grid", "spiral")
+
+
+def flood_fill(grid: GridGraph, start: Tuple[int, int]) -> int:
+    """
+    Клетки, достижимые из start по ортогональным ходам, как битовое
+    множество индексов буфера. Строится по полю bfs_distance_field, то есть
+    за время, линейное от размера сетки, на любой карте.
+    """
+
+    distances, _ = bfs_distance_field(grid, start)
+    return _to_bits(distances.tobytes()[_SIGN_BYTE::4].translate(_REACHED))
+
+
+def ensure_connected(grid: GridGraph, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+    """
+    Освобождение start и end и проверка связи одним обходом в ширину из start.
+    Если end недостижим, прорезается Г-образный коридор (по строке start,
+    затем по столбцу end). Возвращает True, если коридор понадобился.
+    """
+
+    for row, col in (start, end):
+        grid.cells[grid.index(row, col)] = GridGraph.FREE
+    distances, _ = bfs_distance_field(grid, start)
+    if distances[grid.index(end[0], end[1])] >= 0:
+        return False
+    _fill_row(grid, start[0], min(start[1], end[1]), max(start[1], end[1]), GridGraph.FREE)
+    _fill_col(grid, end[1], min(start[0], end[0]), max(start[0], end[0]), GridGraph.FREE)
+    return True
+
+
+def generate(kind: str, rows: int, cols: int,
+             seed: Any = None,
+             connect: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None,
+             **params) -> GridGraph:
+    """
+    Карта генератора kind из GENERATORS; одинаковые (kind, размеры, seed,
+    params) дают одинаковую карту. connect=(start, end) гарантирует путь
+    между двумя клетками (ensure_connected); для генераторов из CONNECTED
+    со свободными start и end заливка не нужна и пропускается.
+    """
+
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown map generator {kind!r}, expected one of {sorted(GENERATORS)}")
+    grid = GENERATORS[kind](rows, cols, random.Random(seed), **params)
+    if connect is not None:
+        start, end = connect
+        if not (kind in CONNECTED and grid.is_valid(start[0], start[1]) and grid.is_valid(end[0], end[1])):
+            ensure_connected(grid, start, end)
+    return grid
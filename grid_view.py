@@ -0,0 +1,302 @@
+import tkinter as tk
+from typing import Iterable, Optional, Tuple
+import argparse
+import math
+import time
+
+from algorithm import GridGraph
+from mapfile import open_grid, read_ascii_map
+from stepwise import a_star_steps, bfs_steps
+
+
+NONE = 0
+VISITED = 2
+PATH = 4
+START = 6
+END = 8
+
+_OVERLAY_COLORS = {
+    VISITED: (0xad, 0xd8, 0xe6),
+    PATH: (0x00, 0x00, 0xff),
+    START: (0x00, 0x80, 0x00),
+    END: (0xff, 0x00, 0x00),
+}
+_CELL_COLORS = {GridGraph.BLOCKED: (0x00, 0x00, 0x00), GridGraph.FREE: (0xff, 0xff, 0xff)}
+
+
+def _channel(channel: int) -> bytes:
+    # Ключ пикселя - клетка (0/1) | код слоя разметки (чётный), слой важнее клетки
+    table = bytearray(256)
+    for key in range(256):
+        color = _OVERLAY_COLORS.get(key & ~1) or _CELL_COLORS[key & 1]
+        table[key] = color[channel]
+    return bytes(table)
+
+
+_RED, _GREEN, _BLUE = (_channel(channel) for channel in range(3))
+
+
+class ImageGridView:
+    """
+    Отрисовка большой сетки через PhotoImage вместо прямоугольника на клетку.
+    image хранит всю сетку в масштабе пиксель на клетку и обновляется только
+    прямоугольником изменённых клеток: PPM-данные строятся по строкам буфера
+    cells и слоя разметки overlay через bytes.translate. На холст копируется
+    видимая часть image средствами Tk с увеличением (zoom) или прореживанием
+    (subsample), поэтому zoom и сдвиг не требуют перерисовки сетки.
+    Изменения сетки через add_obstacle/remove_obstacle отслеживаются
+    подпиской на grid.listeners; flush() выгружает накопленное.
+    """
+
+    ZOOMS = (-8, -4, -2, 1, 2, 4, 8, 16)
+
+    def __init__(self, canvas: tk.Canvas, grid: GridGraph, width: int, height: int):
+
+        self.canvas = canvas
+        self.grid = grid
+        self.width = width
+        self.height = height
+        self.overlay = bytearray(grid.size)
+        self.dirty: Optional[Tuple[int, int, int, int]] = None
+        self.image = tk.PhotoImage(width=grid.cols, height=grid.rows)
+        self.view = tk.PhotoImage(width=width, height=height)
+        self.item = canvas.create_image(0, 0, image=self.view, anchor=tk.NW)
+        self.level = self.ZOOMS.index(1)
+        self.origin = (0.0, 0.0)
+        grid.listeners.append(self.mark)
+        self.upload(0, 0, grid.rows, grid.cols)
+        self.fit()
+
+    @property
+    def scale(self) -> float:
+        """Пикселей холста на клетку"""
+        zoom = self.ZOOMS[self.level]
+        return zoom if zoom > 0 else 1 / -zoom
+
+    def close(self) -> None:
+        """Отписка от изменений сетки"""
+        if self.mark in self.grid.listeners:
+            self.grid.listeners.remove(self.mark)
+
+    def _region_ppm(self, top: int, left: int, bottom: int, right: int) -> bytes:
+        stride = self.grid.stride
+        width = right - left
+        starts = [(row + 1) * stride + left + 1 for row in range(top, bottom)]
+        cells = self.grid.cells
+        keys = b"".join([bytes(cells[start:start + width]) for start in starts])
+        marks = b"".join([self.overlay[start:start + width] for start in starts])
+        if marks.count(NONE) != len(marks):
+            keys = (int.from_bytes(keys, "big") | int.from_bytes(marks, "big")).to_bytes(len(keys), "big")
+        pixels = bytearray(3 * len(keys))
+        pixels[0::3] = keys.translate(_RED)
+        pixels[1::3] = keys.translate(_GREEN)
+        pixels[2::3] = keys.translate(_BLUE)
+        return b"P6\n%d %d\n255\n" % (width, bottom - top) + bytes(pixels)
+
+    def upload(self, top: int, left: int, bottom: int, right: int) -> None:
+        """Перезапись прямоугольника клеток [top, bottom) x [left, right) в image"""
+        if top >= bottom or left >= right:
+            return
+        data = self._region_ppm(top, left, bottom, right)
+        self.image.tk.call(self.image, "put", data, "-format", "ppm", "-to", left, top)
+
+    def mark(self, row: int, col: int) -> None:
+        """Клетка изменилась; выгружается при следующем flush()"""
+        if self.dirty is None:
+            self.dirty = (row, col, row + 1, col + 1)
+        else:
+            top, left, bottom, right = self.dirty
+            self.dirty = (min(top, row), min(left, col), max(bottom, row + 1), max(right, col + 1))
+
+    def paint(self, cells: Iterable[Tuple[int, int]], code: int) -> None:
+        """Разметка клеток кодом слоя (VISITED, PATH, START, END или NONE)"""
+        grid = self.grid
+        overlay = self.overlay
+        for row, col in cells:
+            overlay[grid.index(row, col)] = code
+            self.mark(row, col)
+
+    def clear_overlay(self) -> None:
+        self.overlay = bytearray(self.grid.size)
+        self.dirty = (0, 0, self.grid.rows, self.grid.cols)
+
+    def flush(self) -> None:
+        """Выгрузка изменённого прямоугольника и обновление холста"""
+        if self.dirty is not None:
+            self.upload(*self.dirty)
+            self.dirty = None
+            self.redraw()
+
+    def redraw(self) -> None:
+        zoom = self.ZOOMS[self.level]
+        scale = self.scale
+        top, left = int(self.origin[0]), int(self.origin[1])
+        bottom = min(self.grid.rows, top + math.ceil(self.height / scale))
+        right = min(self.grid.cols, left + math.ceil(self.width / scale))
+        self.view.blank()
+        if top >= bottom or left >= right:
+            return
+        option = "-zoom" if zoom > 0 else "-subsample"
+        self.view.tk.call(self.view, "copy", self.image, "-from", left, top, right, bottom,
+                          "-to", 0, 0, option, abs(zoom), abs(zoom))
+
+    def _clamp(self, row: float, col: float) -> Tuple[float, float]:
+        scale = self.scale
+        row = min(row, self.grid.rows - self.height / scale)
+        col = min(col, self.grid.cols - self.width / scale)
+        return max(0.0, row), max(0.0, col)
+
+    def cell_at(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Клетка под точкой холста; None вне сетки"""
+        row = int(self.origin[0] + y / self.scale)
+        col = int(self.origin[1] + x / self.scale)
+        if 0 <= row < self.grid.rows and 0 <= col < self.grid.cols:
+            return row, col
+        return None
+
+    def zoom_at(self, x: int, y: int, steps: int) -> None:
+        """Смена масштаба на steps уровней; клетка под (x, y) остаётся на месте"""
+        level = max(0, min(len(self.ZOOMS) - 1, self.level + steps))
+        if level == self.level:
+            return
+        row = self.origin[0] + y / self.scale
+        col = self.origin[1] + x / self.scale
+        self.level = level
+        self.origin = self._clamp(row - y / self.scale, col - x / self.scale)
+        self.redraw()
+
+    def pan(self, dx: int, dy: int) -> None:
+        """Сдвиг содержимого на (dx, dy) пикселей холста"""
+        self.origin = self._clamp(self.origin[0] - dy / self.scale, self.origin[1] - dx / self.scale)
+        self.redraw()
+
+    def fit(self) -> None:
+        """Наибольший масштаб, при котором сетка видна целиком"""
+        self.level = 0
+        for level, zoom in enumerate(self.ZOOMS):
+            scale = zoom if zoom > 0 else 1 / -zoom
+            if self.grid.rows * scale <= self.height and self.grid.cols * scale <= self.width:
+                self.level = level
+        self.origin = (0.0, 0.0)
+        self.redraw()
+
+
+class GridViewer:
+    """
+    Окно просмотра больших карт (до 2000x2000 и больше): колесо мыши -
+    масштаб, перетаскивание правой кнопкой - сдвиг, левая кнопка задаёт
+    start и end и запускает пошаговый поиск с покадровой отрисовкой.
+    """
+
+    SIZE = 800
+    FRAME_BUDGET = 0.02
+    STEP_BUDGET = 4096
+
+    def __init__(self, root: tk.Misc, grid: GridGraph, title: str = "Podgląd mapy"):
+
+        self.root = root
+        self.grid = grid
+        self.root.title(f"{title} - {grid.rows}x{grid.cols}")
+        self.canvas = tk.Canvas(root, width=self.SIZE, height=self.SIZE, bg="gray", cursor="cross")
+        self.canvas.pack()
+        self.status_label = tk.Label(root, text="LPM - start/koniec, PPM - przesuń, kółko - powiększenie",
+                                     font=("Arial", 10))
+        self.status_label.pack()
+        self.view = ImageGridView(self.canvas, grid, self.SIZE, self.SIZE)
+        self.start_pos: Optional[Tuple[int, int]] = None
+        self.end_pos: Optional[Tuple[int, int]] = None
+        self.search = None
+        self.search_job = None
+        self.drag_from: Optional[Tuple[int, int]] = None
+
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<ButtonPress-3>", self.on_drag_start)
+        self.canvas.bind("<B3-Motion>", self.on_drag)
+        self.canvas.bind("<MouseWheel>", lambda event: self.on_zoom(event, 1 if event.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda event: self.on_zoom(event, 1))
+        self.canvas.bind("<Button-5>", lambda event: self.on_zoom(event, -1))
+        # Закрытие окна: иначе сетка держит подписку вида, а after - шаг поиска
+        self.canvas.bind("<Destroy>", lambda event: self.close())
+
+    def on_zoom(self, event, steps: int) -> None:
+        self.view.zoom_at(event.x, event.y, steps)
+        self.status_label.config(text=f"Powiększenie: {self.view.scale:g} px/komórkę")
+
+    def on_drag_start(self, event) -> None:
+        self.drag_from = (event.x, event.y)
+
+    def on_drag(self, event) -> None:
+        if self.drag_from is None:
+            return
+        self.view.pan(event.x - self.drag_from[0], event.y - self.drag_from[1])
+        self.drag_from = (event.x, event.y)
+
+    def on_click(self, event) -> None:
+        cell = self.view.cell_at(event.x, event.y)
+        if cell is None or not self.grid.is_valid(cell[0], cell[1]):
+            return
+        if self.start_pos is None or self.end_pos is not None:
+            self.cancel_search()
+            self.view.clear_overlay()
+            self.start_pos, self.end_pos = cell, None
+            self.view.paint([cell], START)
+            self.view.flush()
+            self.status_label.config(text=f"Start: {cell}")
+            return
+        self.end_pos = cell
+        self.view.paint([cell], END)
+        self.start_search()
+
+    def start_search(self) -> None:
+        steps = a_star_steps if self.grid.connectivity == 4 else bfs_steps
+        self.search = steps(self.grid, self.start_pos, self.end_pos, budget=self.STEP_BUDGET)
+        self.advance_search()
+
+    def advance_search(self) -> None:
+        self.search_job = None
+        deadline = time.perf_counter() + self.FRAME_BUDGET
+        endpoints = (self.start_pos, self.end_pos)
+        for progress in self.search:
+            self.view.paint([cell for cell in progress.closed if cell not in endpoints], VISITED)
+            if progress.done or time.perf_counter() >= deadline:
+                break
+        if progress.done:
+            self.search = None
+            if progress.path is not None:
+                self.view.paint(progress.path[1:-1], PATH)
+                text = f"Ścieżka: {len(progress.path)} komórek | Odwiedzone: {progress.expanded}"
+            else:
+                text = f"Brak ścieżki | Odwiedzone: {progress.expanded}"
+            self.status_label.config(text=text)
+        else:
+            self.status_label.config(text=f"Szukanie... Odwiedzone: {progress.expanded}")
+            self.search_job = self.root.after(1, self.advance_search)
+        self.view.flush()
+
+    def cancel_search(self) -> None:
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+        if self.search is not None:
+            self.search.close()
+            self.search = None
+
+    def close(self) -> None:
+        self.cancel_search()
+        self.view.close()
+
+
+def load_map(path: str) -> GridGraph:
+    """Карта .map (Moving AI) или двоичный файл mapfile"""
+    if path.endswith(".map"):
+        return read_ascii_map(path)
+    return open_grid(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Large grid viewer")
+    parser.add_argument("path", help="map file (.map or binary grid)")
+    arguments = parser.parse_args()
+    root = tk.Tk()
+    GridViewer(root, load_map(arguments.path), title=arguments.path)
+    root.mainloop()
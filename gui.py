@@ -1,11 +1,88 @@
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from typing import Set, Tuple, Optional, List
+import os
+import threading
 import time
 import random
 
-from algorithm import find_path, a_star_shortest_path, GridGraph
+from algorithm import a_star_shortest_path, bfs_shortest_path, GridGraph, SearchStats
+from components import ComponentIndex
+from path_cache import PathCache
+from generators import generate
+from grid_view import GridViewer, load_map
+from stepwise import bfs_steps
+
+
+def _instrumented(search):
+    """Поиск, возвращающий (путь, SearchStats) - для подписей и кэша путей"""
+    def run(grid: GridGraph, start: Tuple[int, int], end: Tuple[int, int], on_expand=None):
+        stats = SearchStats(on_expand=on_expand)
+        result = search(grid, start, end, stats=stats)
+        return (result[0] if isinstance(result, tuple) else result), stats
+    return run
+
+
+_bfs_search = _instrumented(bfs_shortest_path)
+_a_star_search = _instrumented(a_star_shortest_path)
+
+
+class SearchCancelled(Exception):
+    """Поиск прерван: задача отменена или устарела"""
+
+
+class SearchTask:
+    """
+    BFS и A* в фоновом потоке над снимком сетки, чтобы цикл Tk не
+    блокировался. Поток не обращается к Tk: GUI опрашивает finished через
+    root.after и читает expanded (раскрыто клеток к этому моменту) и results.
+    cancel() прерывает поиск при следующем раскрытии клетки.
+    """
+
+    SEARCHES = (("bfs", _bfs_search), ("a_star", _a_star_search))
+
+    def __init__(self, grid: GridGraph, start: Tuple[int, int], end: Tuple[int, int],
+                 cache: PathCache, cache_lock: threading.Lock):
+        
+        self.grid = GridGraph.from_buffer(grid.rows, grid.cols, bytearray(grid.cells),
+                                          connectivity=grid.connectivity,
+                                          corner_cutting=grid.corner_cutting)
+        self.grid.version = grid.version
+        self.start = start
+        self.end = end
+        self.cache = cache
+        self.cache_lock = cache_lock
+        self.expanded = 0
+        self.cancelled = False
+        self.results = {}
+        self.error: Optional[BaseException] = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def on_expand(self, row, col):
+        self.expanded += 1
+        if self.cancelled:
+            raise SearchCancelled()
+    
+    def run(self):
+        try:
+            for name, search in self.SEARCHES:
+                began = time.perf_counter()
+                with self.cache_lock:
+                    result = self.cache.find(self.grid, self.start, self.end, search,
+                                             on_expand=self.on_expand)
+                self.results[name] = result, (time.perf_counter() - began) * 1000
+        except SearchCancelled:
+            pass
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished.set()
 
 
 class PathfindingGUI:
@@ -24,6 +101,28 @@ class PathfindingGUI:
     PATH = 4
     VISITED = 5
     
+    COLORS = {
+        EMPTY: COLOR_EMPTY,
+        OBSTACLE: COLOR_OBSTACLE,
+        START: COLOR_START,
+        END: COLOR_END,
+        PATH: COLOR_PATH,
+        VISITED: COLOR_VISITED,
+    }
+    
+    ANIMATION_DELAY = 30
+    POLL_DELAY = 50
+    SEARCH_DEBOUNCE = 300
+    MAX_CANVAS_GRID = 100
+    LARGE_DENSITY = 0.2
+    
+    MAP_KINDS = {
+        "Losowe": "random",
+        "Jaskinie": "cave",
+        "Labirynt": "division",
+        "Pokoje": "dungeon",
+    }
+    
     def calculate_cell_size(self, grid_size):
         if grid_size <= 10:
             return 50
@@ -31,8 +130,12 @@ class PathfindingGUI:
             return 40
         elif grid_size <= 20:
             return 35
-        else:
+        elif grid_size <= 25:
             return 30
+        elif grid_size <= 50:
+            return 14
+        else:
+            return 7
     
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -51,9 +154,19 @@ class PathfindingGUI:
         self.grid_state[self.GRID_SIZE - 1][self.GRID_SIZE - 1] = self.END
         
         self.obstacles: Set[Tuple[int, int]] = set()
+        self.painted: Set[Tuple[int, int]] = set()
+        self.cell_items: List[List[int]] = []
+        self.path_cache = PathCache(capacity=256)
+        self.cache_lock = threading.Lock()
+        self.rebuild_graph()
         
         self.current_path: Optional[List[Tuple[int, int]]] = None
-        self.path_index = 0
+        self.search_steps = None
+        self.animation_job = None
+        self.search_task: Optional[SearchTask] = None
+        self.poll_job = None
+        self.debounce_job = None
+        self.live_search = False
         
         self.canvas = tk.Canvas(root, 
                                width=self.GRID_SIZE * self.CELL_SIZE,
@@ -84,11 +197,19 @@ class PathfindingGUI:
         tk.Label(size_frame, text="Rozmiar siatki:", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
         
         self.size_var = tk.StringVar(value="10x10")
-        size_options = ["10x10", "15x15", "20x20", "25x25"]
+        size_options = ["10x10", "15x15", "20x20", "25x25", "50x50", "100x100",
+                        "500x500", "1000x1000", "2000x2000"]
         self.size_menu = tk.OptionMenu(size_frame, self.size_var, *size_options, command=self.change_grid_size)
         self.size_menu.config(font=("Arial", 9))
         self.size_menu.pack(side=tk.LEFT, padx=5)
         
+        tk.Label(size_frame, text="Typ mapy:", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+        
+        self.map_kind_var = tk.StringVar(value="Losowe")
+        self.map_kind_menu = tk.OptionMenu(size_frame, self.map_kind_var, *self.MAP_KINDS)
+        self.map_kind_menu.config(font=("Arial", 9))
+        self.map_kind_menu.pack(side=tk.LEFT, padx=5)
+        
         self.start_button = tk.Button(button_frame,
                                      text="Rozpocznij wyszukiwanie",
                                      command=self.find_path,
@@ -116,6 +237,25 @@ class PathfindingGUI:
                                       width=15)
         self.random_button.pack(side=tk.LEFT, padx=5)
         
+        self.open_button = tk.Button(button_frame,
+                                    text="Otwórz mapę",
+                                    command=self.open_map_file,
+                                    bg="gray",
+                                    fg="white",
+                                    font=("Arial", 11, "bold"),
+                                    width=12)
+        self.open_button.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_button = tk.Button(button_frame,
+                                      text="Anuluj",
+                                      command=self.cancel_button_pressed,
+                                      bg="red",
+                                      fg="white",
+                                      font=("Arial", 11, "bold"),
+                                      width=8,
+                                      state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
         self.info_label = tk.Label(root,
                                   text="BFS: Przeszukiwanie wszerz - eksploruje wszystkie kierunki równomiernie",
                                   font=("Arial", 9),
@@ -143,38 +283,52 @@ class PathfindingGUI:
                                    fg="blue")
         self.astar_label.pack()
         
+        self.search_interactive = False
         self.draw_grid()
     
     def draw_grid(self):
+        """Создание прямоугольников клеток - один раз на размер сетки"""
         
         self.canvas.delete("all")
+        outline = "gray" if self.CELL_SIZE >= 10 else ""
         
+        self.cell_items = []
         for row in range(self.GRID_SIZE):
+            items = []
             for col in range(self.GRID_SIZE):
                 x1 = col * self.CELL_SIZE
                 y1 = row * self.CELL_SIZE
                 x2 = x1 + self.CELL_SIZE
                 y2 = y1 + self.CELL_SIZE
                 
-                cell_type = self.grid_state[row][col]
-                if cell_type == self.START:
-                    color = self.COLOR_START
-                elif cell_type == self.END:
-                    color = self.COLOR_END
-                elif cell_type == self.OBSTACLE:
-                    color = self.COLOR_OBSTACLE
-                elif cell_type == self.PATH:
-                    color = self.COLOR_PATH
-                elif cell_type == self.VISITED:
-                    color = self.COLOR_VISITED
+                items.append(self.canvas.create_rectangle(x1, y1, x2, y2,
+                                                          fill=self.COLORS[self.grid_state[row][col]],
+                                                          outline=outline,
+                                                          width=1))
+            self.cell_items.append(items)
+    
+    def set_cell(self, row, col, state):
+        """Смена состояния клетки; перекрашивается только её прямоугольник"""
+        if self.grid_state[row][col] == state:
+            return
+        self.grid_state[row][col] = state
+        if state == self.PATH or state == self.VISITED:
+            self.painted.add((row, col))
+        else:
+            self.painted.discard((row, col))
+        self.canvas.itemconfig(self.cell_items[row][col], fill=self.COLORS[state])
+    
+    def reset_cells(self):
+        for row in range(self.GRID_SIZE):
+            for col in range(self.GRID_SIZE):
+                if (row, col) == self.start_pos:
+                    self.set_cell(row, col, self.START)
+                elif (row, col) == self.end_pos:
+                    self.set_cell(row, col, self.END)
+                elif (row, col) in self.obstacles:
+                    self.set_cell(row, col, self.OBSTACLE)
                 else:
-                    color = self.COLOR_EMPTY
-                
-                # Draw rectangle
-                self.canvas.create_rectangle(x1, y1, x2, y2,
-                                            fill=color,
-                                            outline="gray",
-                                            width=1)
+                    self.set_cell(row, col, self.EMPTY)
     
     def on_canvas_click(self, event):
         col = event.x // self.CELL_SIZE
@@ -189,12 +343,12 @@ class PathfindingGUI:
             return
         if (row, col) not in self.obstacles:
             self.obstacles.add((row, col))
-            self.grid_state[row][col] = self.OBSTACLE
+            self.graph.add_obstacle(row, col)
+            self.set_cell(row, col, self.OBSTACLE)
         
         self.current_path = None
-        self.path_index = 0
-        
-        self.draw_grid()
+        self.cancel_animation()
+        self.schedule_search()
     
     def on_canvas_right_click(self, event):
         col = event.x // self.CELL_SIZE
@@ -207,10 +361,11 @@ class PathfindingGUI:
             return
         if (row, col) in self.obstacles:
             self.obstacles.remove((row, col))
-            self.grid_state[row][col] = self.EMPTY
+            self.graph.remove_obstacle(row, col)
+            self.set_cell(row, col, self.EMPTY)
         self.current_path = None
-        self.path_index = 0
-        self.draw_grid()
+        self.cancel_animation()
+        self.schedule_search()
     
     def on_canvas_drag(self, event):
         col = event.x // self.CELL_SIZE
@@ -223,10 +378,11 @@ class PathfindingGUI:
             return
         if (row, col) not in self.obstacles:
             self.obstacles.add((row, col))
-            self.grid_state[row][col] = self.OBSTACLE
+            self.graph.add_obstacle(row, col)
+            self.set_cell(row, col, self.OBSTACLE)
             self.current_path = None
-            self.path_index = 0
-            self.draw_grid()
+            self.cancel_animation()
+            self.schedule_search()
     
     def on_canvas_right_drag(self, event):
         col = event.x // self.CELL_SIZE
@@ -239,165 +395,211 @@ class PathfindingGUI:
             return
         if (row, col) in self.obstacles:
             self.obstacles.remove((row, col))
-            self.grid_state[row][col] = self.EMPTY
+            self.graph.remove_obstacle(row, col)
+            self.set_cell(row, col, self.EMPTY)
             self.current_path = None
-            self.path_index = 0
-            self.draw_grid()
+            self.cancel_animation()
+            self.schedule_search()
     
     def find_path(self):
+        self.live_search = True
+        self.start_search(interactive=True)
+    
+    def start_search(self, interactive=False):
+        self.cancel_animation()
+        self.cancel_search()
         self.reset_visualization()
-        start_time_bfs = time.perf_counter()
-        path_bfs = find_path(self.GRID_SIZE, self.GRID_SIZE, 
-                            self.obstacles, self.start_pos, self.end_pos)
-        time_bfs = (time.perf_counter() - start_time_bfs) * 1000
-        graph = GridGraph(self.GRID_SIZE, self.GRID_SIZE, self.obstacles)
-        start_time_astar = time.perf_counter()
-        path_astar, visited_astar = a_star_shortest_path(graph, self.start_pos, self.end_pos)
-        time_astar = (time.perf_counter() - start_time_astar) * 1000
-        visited_bfs = len(self.get_bfs_visited_count())
+        self.search_interactive = interactive
+        if not self.components.connected(self.start_pos, self.end_pos):
+            # Разные компоненты: ответ "нет пути" без обхода всей области в фоне
+            self.show_results({name: ((None, SearchStats()), 0.0) for name, _ in SearchTask.SEARCHES})
+            return
+        self.search_task = SearchTask(self.graph, self.start_pos, self.end_pos,
+                                      self.path_cache, self.cache_lock)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.poll_search()
+    
+    def poll_search(self):
+        self.poll_job = None
+        task = self.search_task
+        if task is None:
+            return
+        if not task.finished.is_set():
+            self.status_label.config(text=f"⏳ Szukanie... Odwiedzone: {task.expanded}", fg="gray")
+            self.poll_job = self.root.after(self.POLL_DELAY, self.poll_search)
+            return
+        
+        self.search_task = None
+        self.cancel_button.config(state=tk.DISABLED)
+        if task.error is not None:
+            self.status_label.config(text=f"❌ Błąd wyszukiwania: {task.error}", fg="red")
+            return
+        self.show_results(task.results)
+    
+    def schedule_search(self):
+        """После правки: отмена устаревшего поиска и повтор после паузы в правках"""
+        self.cancel_search()
+        if not self.live_search:
+            return
+        if self.debounce_job is not None:
+            self.root.after_cancel(self.debounce_job)
+        self.debounce_job = self.root.after(self.SEARCH_DEBOUNCE, self.run_debounced_search)
+    
+    def run_debounced_search(self):
+        self.debounce_job = None
+        self.start_search()
+    
+    def cancel_search(self):
+        if self.debounce_job is not None:
+            self.root.after_cancel(self.debounce_job)
+            self.debounce_job = None
+        if self.poll_job is not None:
+            self.root.after_cancel(self.poll_job)
+            self.poll_job = None
+        if self.search_task is not None:
+            self.search_task.cancel()
+            self.search_task = None
+            self.cancel_button.config(state=tk.DISABLED)
+    
+    def cancel_button_pressed(self):
+        self.live_search = False
+        self.cancel_search()
+        self.cancel_animation()
+        self.status_label.config(text="Wyszukiwanie anulowane.", fg="blue")
+    
+    def show_results(self, results):
+        (path_bfs, stats_bfs), time_bfs = results["bfs"]
+        (path_astar, stats_astar), time_astar = results["a_star"]
         
         if path_bfs is None or path_astar is None:
             self.status_label.config(text="❌ Nie znaleziono ścieżki! Przeszkody blokują wszystkie trasy.",
                                     fg="red")
-            messagebox.showwarning("Brak ścieżki",
-                                 "Nie istnieje ścieżka od początku do końca.\n"
-                                 "Przeszkody całkowicie blokują wszystkie trasy.")
-            self.bfs_label.config(text=f"BFS: Brak ścieżki | Czas: {time_bfs:.2f}ms")
-            self.astar_label.config(text=f"A*: Brak ścieżki | Czas: {time_astar:.2f}ms")
+            if self.search_interactive:
+                messagebox.showwarning("Brak ścieżki",
+                                     "Nie istnieje ścieżka od początku do końca.\n"
+                                     "Przeszkody całkowicie blokują wszystkie trasy.")
+            self.bfs_label.config(
+                text=f"BFS: Brak ścieżki | Odwiedzone: {stats_bfs.expanded} | Czas: {time_bfs:.2f}ms")
+            self.astar_label.config(
+                text=f"A*: Brak ścieżki | Odwiedzone: {stats_astar.expanded} | Czas: {time_astar:.2f}ms")
         else:
             self.current_path = path_bfs
-            self.path_index = 0
             path_len = len(path_bfs)
             self.status_label.config(text=f"✓ Znaleziono ścieżkę! Długość: {path_len} komórek",
                                     fg="green")
             self.bfs_label.config(
-                text=f"BFS: {path_len} komórek | Odwiedzone: ~{visited_bfs} | Czas: {time_bfs:.2f}ms",
+                text=f"BFS: {path_len} komórek | Odwiedzone: {stats_bfs.expanded} | "
+                     f"Maks. kolejka: {stats_bfs.heap_peak} | Czas: {time_bfs:.2f}ms",
                 fg="green"
             )
             self.astar_label.config(
-                text=f"A*: {path_len} komórek | Odwiedzone: {visited_astar} | Czas: {time_astar:.2f}ms",
+                text=f"A*: {path_len} komórek | Odwiedzone: {stats_astar.expanded} | "
+                     f"Maks. kolejka: {stats_astar.heap_peak} | Czas: {time_astar:.2f}ms",
                 fg="blue"
             )
-            self.visualize_path(path_bfs)
-    
-    def get_bfs_visited_count(self):
-        visited = set()
-        from collections import deque
-        queue = deque([self.start_pos])
-        visited.add(self.start_pos)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        while queue:
-            row, col = queue.popleft()
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                if (0 <= new_row < self.GRID_SIZE and 
-                    0 <= new_col < self.GRID_SIZE and
-                    (new_row, new_col) not in visited and
-                    (new_row, new_col) not in self.obstacles):
-                    visited.add((new_row, new_col))
-                    queue.append((new_row, new_col))
-        
-        return visited
+            self.start_search_animation()
+    
+    def rebuild_graph(self):
+        self.graph = GridGraph(self.GRID_SIZE, self.GRID_SIZE, self.obstacles)
+        self.components = ComponentIndex(self.graph)
     
     def visualize_path(self, path):
         for row, col in path:
             if (row, col) != self.start_pos and (row, col) != self.end_pos:
-                self.grid_state[row][col] = self.PATH
-        self.draw_grid()
+                self.set_cell(row, col, self.PATH)
+    
+    def start_search_animation(self):
+        self.cancel_animation()
+        self.search_steps = bfs_steps(self.graph, self.start_pos, self.end_pos,
+                                      budget=max(1, self.GRID_SIZE // 2))
+        self.animate_search()
     
-    def animate_path(self):
-        if self.current_path is None or self.path_index >= len(self.current_path):
+    def animate_search(self):
+        self.animation_job = None
+        if self.search_steps is None:
             return
         
-        row, col = self.current_path[self.path_index]
-        
-        if (row, col) != self.start_pos and (row, col) != self.end_pos:
-            self.grid_state[row][col] = self.PATH
+        progress = next(self.search_steps)
+        for row, col in progress.closed:
+            if (row, col) != self.start_pos and (row, col) != self.end_pos:
+                self.set_cell(row, col, self.VISITED)
         
-        self.draw_grid()
-        self.path_index += 1
+        if progress.done:
+            self.search_steps = None
+            self.current_path = progress.path
+            if progress.path is not None:
+                self.visualize_path(progress.path)
+            return
         
-        self.root.after(100, self.animate_path)
+        self.animation_job = self.root.after(self.ANIMATION_DELAY, self.animate_search)
+    
+    def stop_live_search(self):
+        self.live_search = False
+        self.cancel_search()
+        self.cancel_animation()
+    
+    def cancel_animation(self):
+        if self.animation_job is not None:
+            self.root.after_cancel(self.animation_job)
+            self.animation_job = None
+        if self.search_steps is not None:
+            self.search_steps.close()
+            self.search_steps = None
     
     def reset_visualization(self):
-        for row in range(self.GRID_SIZE):
-            for col in range(self.GRID_SIZE):
-                if self.grid_state[row][col] == self.PATH or \
-                   self.grid_state[row][col] == self.VISITED:
-                    if (row, col) not in self.obstacles:
-                        self.grid_state[row][col] = self.EMPTY
-        self.draw_grid()
+        for row, col in list(self.painted):
+            self.set_cell(row, col, self.EMPTY)
     
     def clear_grid(self):
         self.obstacles.clear()
+        self.rebuild_graph()
         self.current_path = None
-        self.path_index = 0
-        self.grid_state = [[self.EMPTY for _ in range(self.GRID_SIZE)] 
-                          for _ in range(self.GRID_SIZE)]
-        self.grid_state[0][0] = self.START
-        self.grid_state[self.GRID_SIZE - 1][self.GRID_SIZE - 1] = self.END
+        self.stop_live_search()
+        self.reset_cells()
         
         self.status_label.config(text="Siatka wyczyszczona. Gotowa do umieszczania nowych przeszkód.",
                                 fg="blue")
-        self.draw_grid()
     
     def generate_random_obstacles(self):
-        self.obstacles.clear()
         self.current_path = None
-        self.path_index = 0
+        self.stop_live_search()
         
-        self.grid_state = [[self.EMPTY for _ in range(self.GRID_SIZE)] 
-                          for _ in range(self.GRID_SIZE)]
-        self.grid_state[0][0] = self.START
-        self.grid_state[self.GRID_SIZE - 1][self.GRID_SIZE - 1] = self.END
+        kind = self.MAP_KINDS[self.map_kind_var.get()]
+        params = {"density": random.uniform(0.15, 0.25)} if kind == "random" else {}
+        self.graph = generate(kind, self.GRID_SIZE, self.GRID_SIZE,
+                              connect=(self.start_pos, self.end_pos), **params)
+        self.components = ComponentIndex(self.graph)
+        self.obstacles = self.graph.obstacles
+        self.reset_cells()
         
-        start_neighbors = self.get_cell_neighbors(self.start_pos[0], self.start_pos[1])
-        end_neighbors = self.get_cell_neighbors(self.end_pos[0], self.end_pos[1])
-        
-        total_cells = self.GRID_SIZE * self.GRID_SIZE
-        obstacle_count = random.randint(int(total_cells * 0.15), int(total_cells * 0.25))
-        
-        added = 0
-        max_attempts = obstacle_count * 10
-        attempts = 0
-        
-        while added < obstacle_count and attempts < max_attempts:
-            row = random.randint(0, self.GRID_SIZE - 1)
-            col = random.randint(0, self.GRID_SIZE - 1)
-            attempts += 1
-            
-            if (row, col) == self.start_pos or (row, col) == self.end_pos:
-                continue
-            if (row, col) in self.obstacles:
-                continue
-            
-            self.obstacles.add((row, col))
-            
-            free_start_neighbors = [n for n in start_neighbors if n not in self.obstacles]
-            free_end_neighbors = [n for n in end_neighbors if n not in self.obstacles]
-            
-            if len(free_start_neighbors) == 0 or len(free_end_neighbors) == 0:
-                self.obstacles.remove((row, col))
-                continue
-            
-            self.grid_state[row][col] = self.OBSTACLE
-            added += 1
-        
-        self.status_label.config(text=f"Wygenerowano {added} losowych przeszkód!",
+        self.status_label.config(text=f"Wygenerowano {len(self.obstacles)} losowych przeszkód!",
                                 fg="purple")
-        self.draw_grid()
     
-    def get_cell_neighbors(self, row, col):
-        neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < self.GRID_SIZE and 0 <= new_col < self.GRID_SIZE:
-                neighbors.append((new_row, new_col))
-        return neighbors
+    def open_map_file(self):
+        path = filedialog.askopenfilename(title="Otwórz mapę",
+                                          filetypes=[("Mapy", "*.map *.grid"), ("Wszystkie pliki", "*")])
+        if not path:
+            return
+        try:
+            grid = load_map(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Błąd mapy", str(error))
+            return
+        GridViewer(tk.Toplevel(self.root), grid, title=os.path.basename(path))
+    
+    def open_large_grid(self, size):
+        """Сетки крупнее MAX_CANVAS_GRID открываются в просмотре через PhotoImage"""
+        kind = self.MAP_KINDS[self.map_kind_var.get()]
+        params = {"density": self.LARGE_DENSITY} if kind == "random" else {}
+        grid = generate(kind, size, size, **params)
+        GridViewer(tk.Toplevel(self.root), grid, title=self.map_kind_var.get())
     
     def change_grid_size(self, selection):
         size = int(selection.split('x')[0])
+        if size > self.MAX_CANVAS_GRID:
+            self.size_var.set(f"{self.GRID_SIZE}x{self.GRID_SIZE}")
+            self.open_large_grid(size)
+            return
         self.GRID_SIZE = size
         self.CELL_SIZE = self.calculate_cell_size(size)
         
@@ -405,11 +607,13 @@ class PathfindingGUI:
         self.canvas.config(width=new_canvas_size, height=new_canvas_size)
         
         self.obstacles.clear()
+        self.rebuild_graph()
         self.current_path = None
-        self.path_index = 0
+        self.stop_live_search()
         
         self.grid_state = [[self.EMPTY for _ in range(self.GRID_SIZE)] 
                           for _ in range(self.GRID_SIZE)]
+        self.painted.clear()
         
         self.start_pos = (0, 0)
         self.end_pos = (self.GRID_SIZE - 1, self.GRID_SIZE - 1)
@@ -0,0 +1,302 @@
+from typing import Dict, List, Tuple, Optional, Iterable
+import heapq
+import time
+
+from algorithm import GridGraph, SearchStats, a_star_shortest_path
+
+
+class HierarchicalGraph:
+    """
+    Абстракция HPA*: сетка делится на кластеры cluster_size x cluster_size,
+    на общих границах кластеров выбираются входы, внутри кластеров
+    заранее считаются расстояния между входами.
+    entrance_width - максимальная ширина участка границы на один вход;
+    при entrance_width=1 каждая пара граничных клеток становится входом
+    и пути совпадают по длине с точным A*. Только для 4-связной сетки.
+    Граф относится к версии сетки grid.version на момент build(); если
+    сетка изменилась, hpa_star_shortest_path перестраивает его перед поиском.
+    """
+
+    def __init__(self, grid: GridGraph, cluster_size: int = 10, entrance_width: int = 6):
+
+        if grid.connectivity != 4:
+            raise ValueError("HPA* supports 4-connected grids only")
+
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.entrance_width = entrance_width
+        self.edges: Dict[int, Dict[int, int]] = {}
+        self.cluster_entrances: Dict[Tuple[int, int], List[int]] = {}
+        self.build()
+
+    def cluster_of(self, index: int) -> Tuple[int, int]:
+        row, col = self.grid.coords(index)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _bounds(self, cluster: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        size = self.cluster_size
+        top = cluster[0] * size + 1
+        left = cluster[1] * size + 1
+        bottom = min(top + size, self.grid.rows + 1)
+        right = min(left + size, self.grid.cols + 1)
+        return top, bottom, left, right
+
+    def _add_edge(self, a: int, b: int, cost: int) -> None:
+        if cost < self.edges.setdefault(a, {}).get(b, cost + 1):
+            self.edges[a][b] = cost
+            self.edges.setdefault(b, {})[a] = cost
+
+    def _add_entrance(self, cluster: Tuple[int, int], index: int) -> None:
+        entrances = self.cluster_entrances.setdefault(cluster, [])
+        if index not in entrances:
+            entrances.append(index)
+
+    def _scan_border(self, pairs: Iterable[Tuple[int, int]],
+                     first: Tuple[int, int], second: Tuple[int, int]) -> None:
+        cells = self.grid.cells
+        run: List[Tuple[int, int]] = []
+        for a, b in list(pairs) + [(0, 0)]:
+            if cells[a] and cells[b]:
+                run.append((a, b))
+                continue
+            for chunk_start in range(0, len(run), self.entrance_width):
+                chunk = run[chunk_start:chunk_start + self.entrance_width]
+                inner, outer = chunk[len(chunk) // 2]
+                self._add_entrance(first, inner)
+                self._add_entrance(second, outer)
+                self._add_edge(inner, outer, 1)
+            run = []
+
+    def _cluster_bfs(self, source: int, cluster: Tuple[int, int],
+                     targets: Optional[Iterable[int]] = None) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """BFS из source, не выходящий за границы кластера"""
+
+        cells = self.grid.cells
+        offsets = self.grid.offsets
+        stride = self.grid.stride
+        top, bottom, left, right = self._bounds(cluster)
+        remaining = set(targets) if targets is not None else None
+        if remaining is not None:
+            remaining.discard(source)
+
+        distance = {source: 0}
+        parent = {source: -1}
+        frontier = [source]
+        while frontier and (remaining is None or remaining):
+            next_frontier = []
+            for current in frontier:
+                level = distance[current] + 1
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not cells[neighbor] or neighbor in distance:
+                        continue
+                    row, col = divmod(neighbor, stride)
+                    if not (top <= row < bottom and left <= col < right):
+                        continue
+                    distance[neighbor] = level
+                    parent[neighbor] = current
+                    next_frontier.append(neighbor)
+                    if remaining is not None:
+                        remaining.discard(neighbor)
+            frontier = next_frontier
+
+        return distance, parent
+
+    def build(self) -> None:
+        """Полный пересчёт абстрактного графа по текущей сетке"""
+
+        grid = self.grid
+        self.version = grid.version
+        size = self.cluster_size
+        self.edges = {}
+        self.cluster_entrances = {}
+        cluster_rows = (grid.rows + size - 1) // size
+        cluster_cols = (grid.cols + size - 1) // size
+
+        for cr in range(cluster_rows):
+            for cc in range(cluster_cols):
+                top, bottom, left, right = self._bounds((cr, cc))
+                if cc + 1 < cluster_cols:
+                    col = right - 1
+                    self._scan_border(((row * grid.stride + col, row * grid.stride + col + 1)
+                                       for row in range(top, bottom)),
+                                      (cr, cc), (cr, cc + 1))
+                if cr + 1 < cluster_rows:
+                    row = bottom - 1
+                    self._scan_border(((row * grid.stride + col, (row + 1) * grid.stride + col)
+                                       for col in range(left, right)),
+                                      (cr, cc), (cr + 1, cc))
+
+        for cluster, entrances in self.cluster_entrances.items():
+            for i, entrance in enumerate(entrances):
+                others = entrances[i + 1:]
+                if not others:
+                    continue
+                distance, _ = self._cluster_bfs(entrance, cluster, others)
+                for other in others:
+                    if other in distance:
+                        self._add_edge(entrance, other, distance[other])
+
+    def connect(self, index: int) -> Dict[int, int]:
+        """Расстояния от клетки до входов её кластера"""
+
+        cluster = self.cluster_of(index)
+        entrances = self.cluster_entrances.get(cluster, [])
+        distance, _ = self._cluster_bfs(index, cluster, entrances)
+        return {entrance: distance[entrance] for entrance in entrances if entrance in distance}
+
+    def refine(self, nodes: List[int]) -> List[Tuple[int, int]]:
+        """Развёртывание абстрактного пути в путь по клеткам"""
+
+        path = [self.grid.coords(nodes[0])]
+        for a, b in zip(nodes, nodes[1:]):
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                path.append(self.grid.coords(b))
+                continue
+            _, parent = self._cluster_bfs(a, cluster, [b])
+            segment = []
+            node = b
+            while node != a:
+                segment.append(self.grid.coords(node))
+                node = parent[node]
+            path.extend(reversed(segment))
+        return path
+
+
+def hpa_star_shortest_path(graph: HierarchicalGraph,
+                           start: Tuple[int, int],
+                           end: Tuple[int, int],
+                           stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """
+    Поиск A* по абстрактному графу HPA* с последующим развёртыванием пути.
+    В stats фазы: connect (подключение start/end к входам кластеров),
+    search (абстрактный A*) и reconstruct (развёртывание); счётчики и
+    обратные вызовы относятся к абстрактным узлам. Если сетка изменилась
+    после построения graph, граф сначала перестраивается (graph.build()).
+    Возвращает: (путь, количество раскрытых абстрактных узлов)
+    """
+
+    grid = graph.grid
+    if grid.version != graph.version:
+        graph.build()
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        return None, 0
+
+    if start == end:
+        return [start], 1
+
+    if grid.unreachable(start, end):
+        return None, 0
+
+    stride = grid.stride
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+    began = time.perf_counter() if stats is not None else 0.0
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+
+    source_edges = graph.connect(source)
+    target_edges = graph.connect(target)
+    local_cost = -1
+    if graph.cluster_of(source) == graph.cluster_of(target):
+        distance, _ = graph._cluster_bfs(source, graph.cluster_of(source), [target])
+        local_cost = distance.get(target, -1)
+
+    connected = time.perf_counter() if stats is not None else 0.0
+    open_set = [(0, source)]
+    parent = {source: -1}
+    g_score = {source: 0}
+    closed = set()
+    visited_count = 0
+    pushes = 1
+    heap_peak = 1
+    reopened = 0
+
+    while open_set:
+        if len(open_set) > heap_peak:
+            heap_peak = len(open_set)
+        current_f, current = heapq.heappop(open_set)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
+
+        if current == target:
+            break
+        if local_cost != -1 and current_f >= local_cost:
+            break
+
+        neighbors = dict(graph.edges.get(current, {}))
+        if current == source:
+            neighbors.update(source_edges)
+        if current in target_edges:
+            neighbors[target] = target_edges[current]
+
+        for neighbor, cost in neighbors.items():
+            new_g = g_score[current] + cost
+            if neighbor not in g_score or new_g < g_score[neighbor]:
+                if neighbor in g_score:
+                    reopened += 1
+                g_score[neighbor] = new_g
+                parent[neighbor] = current
+                row, col = divmod(neighbor, stride)
+                heapq.heappush(open_set, (new_g + abs(row - end_row) + abs(col - end_col), neighbor))
+                pushes += 1
+                if on_push is not None:
+                    on_push(row - 1, col - 1)
+
+    searched = time.perf_counter() if stats is not None else 0.0
+    path = None
+    if target in closed and (local_cost == -1 or g_score[target] <= local_cost):
+        nodes = []
+        node = target
+        while node != -1:
+            nodes.append(node)
+            node = parent[node]
+        path = graph.refine(nodes[::-1])
+    elif local_cost != -1:
+        path = graph.refine([source, target])
+
+    if stats is not None:
+        stats.record(visited_count, pushes, heap_peak, reopened,
+                     connect=connected - began, search=searched - connected,
+                     reconstruct=time.perf_counter() - searched)
+    return path, visited_count
+
+
+def suboptimality_report(graph: HierarchicalGraph,
+                         queries: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Dict[str, float]:
+    """Сравнение длин путей и числа раскрытых узлов HPA* с точным A*"""
+
+    solved = 0
+    total_ratio = 0.0
+    max_ratio = 1.0
+    hpa_expanded = 0
+    astar_expanded = 0
+
+    for start, end in queries:
+        path, expanded = hpa_star_shortest_path(graph, start, end)
+        exact, visited = a_star_shortest_path(graph.grid, start, end)
+        hpa_expanded += expanded
+        astar_expanded += visited
+        if path is None or exact is None:
+            continue
+        ratio = (len(path) - 1) / max(len(exact) - 1, 1)
+        solved += 1
+        total_ratio += ratio
+        max_ratio = max(max_ratio, ratio)
+
+    return {
+        "queries": len(queries),
+        "solved": solved,
+        "mean_ratio": total_ratio / solved if solved else 1.0,
+        "max_ratio": max_ratio,
+        "hpa_expanded": hpa_expanded,
+        "astar_expanded": astar_expanded,
+    }
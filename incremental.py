@@ -0,0 +1,173 @@
+from typing import Dict, List, Tuple, Optional
+import heapq
+
+from algorithm import GridGraph
+
+
+INF = float("inf")
+
+
+class IncrementalPlanner:
+    """
+    D* Lite: поиск ведётся от end к start, состояние (g, rhs, очередь)
+    сохраняется между вызовами plan(). Планировщик подписывается на
+    add_obstacle/remove_obstacle сетки и при следующем plan() пересчитывает
+    только затронутую область.
+    """
+
+    def __init__(self, grid: GridGraph, start: Tuple[int, int], end: Tuple[int, int]):
+
+        self.grid = grid
+        self.start = grid.index(start[0], start[1])
+        self.goal = grid.index(end[0], end[1])
+        self.g: Dict[int, float] = {}
+        self.rhs: Dict[int, float] = {self.goal: 0}
+        self.open_set: List[Tuple[float, float, int]] = []
+        self.queued: Dict[int, Tuple[float, float]] = {}
+        self.km = 0
+        self.last_start = self.start
+        self.pending: List[int] = []
+        self._push(self.goal)
+        grid.listeners.append(self._on_cell_changed)
+
+    def detach(self) -> None:
+        """Отписка от изменений сетки"""
+        if self._on_cell_changed in self.grid.listeners:
+            self.grid.listeners.remove(self._on_cell_changed)
+
+    def _on_cell_changed(self, row: int, col: int) -> None:
+        self.pending.append(self.grid.index(row, col))
+
+    def _heuristic(self, node: int) -> int:
+        row, col = divmod(node, self.grid.stride)
+        start_row, start_col = divmod(self.start, self.grid.stride)
+        return abs(row - start_row) + abs(col - start_col)
+
+    def _key(self, node: int) -> Tuple[float, float]:
+        best = min(self.g.get(node, INF), self.rhs.get(node, INF))
+        return best + self._heuristic(node) + self.km, best
+
+    def _push(self, node: int) -> None:
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.open_set, (key[0], key[1], node))
+
+    def _top(self) -> Tuple[Tuple[float, float], int]:
+        open_set = self.open_set
+        while open_set:
+            k1, k2, node = open_set[0]
+            if self.queued.get(node) == (k1, k2):
+                return (k1, k2), node
+            heapq.heappop(open_set)
+        return (INF, INF), -1
+
+    def _best_successor(self, node: int) -> float:
+        cells = self.grid.cells
+        if not cells[node]:
+            return INF
+        g = self.g
+        best = INF
+        for offset in self.grid.offsets:
+            neighbor = node + offset
+            if cells[neighbor]:
+                cost = g.get(neighbor, INF) + 1
+                if cost < best:
+                    best = cost
+        return best
+
+    def _update_vertex(self, node: int) -> None:
+        if node != self.goal:
+            self.rhs[node] = self._best_successor(node)
+        if self.g.get(node, INF) != self.rhs.get(node, INF):
+            self._push(node)
+        else:
+            self.queued.pop(node, None)
+
+    def _compute_shortest_path(self) -> int:
+        cells = self.grid.cells
+        offsets = self.grid.offsets
+        g = self.g
+        rhs = self.rhs
+        expanded = 0
+
+        while True:
+            top_key, node = self._top()
+            start_key = self._key(self.start)
+            if not (top_key < start_key or rhs.get(self.start, INF) > g.get(self.start, INF)):
+                break
+
+            new_key = self._key(node)
+            if top_key < new_key:
+                self._push(node)
+                continue
+
+            expanded += 1
+            del self.queued[node]
+            heapq.heappop(self.open_set)
+            if g.get(node, INF) > rhs.get(node, INF):
+                g[node] = rhs[node]
+                if not cells[node]:
+                    continue
+                for offset in offsets:
+                    neighbor = node + offset
+                    if cells[neighbor] and neighbor != self.goal and g[node] + 1 < rhs.get(neighbor, INF):
+                        rhs[neighbor] = g[node] + 1
+                        if g.get(neighbor, INF) != rhs[neighbor]:
+                            self._push(neighbor)
+                        else:
+                            self.queued.pop(neighbor, None)
+            else:
+                g[node] = INF
+                self._update_vertex(node)
+                for offset in offsets:
+                    neighbor = node + offset
+                    if cells[neighbor]:
+                        self._update_vertex(neighbor)
+
+        return expanded
+
+    def move_start(self, start: Tuple[int, int]) -> None:
+        """Смена стартовой клетки (агент продвинулся по пути)"""
+        self.start = self.grid.index(start[0], start[1])
+        self.km += self._heuristic(self.last_start)
+        self.last_start = self.start
+
+    def plan(self) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        Обработка накопленных изменений сетки и восстановление пути.
+        Возвращает: (путь, количество раскрытых клеток в этом вызове)
+        """
+
+        grid = self.grid
+        cells = grid.cells
+        pending, self.pending = self.pending, []
+        for changed in set(pending):
+            self._update_vertex(changed)
+            for offset in grid.offsets:
+                neighbor = changed + offset
+                if cells[neighbor]:
+                    self._update_vertex(neighbor)
+
+        if not cells[self.start] or not cells[self.goal]:
+            return None, 0
+
+        if self.start == self.goal:
+            return [grid.coords(self.start)], 1
+
+        expanded = self._compute_shortest_path()
+        if self.rhs.get(self.start, INF) == INF:
+            return None, expanded
+
+        path = [grid.coords(self.start)]
+        node = self.start
+        while node != self.goal:
+            best = INF
+            following = -1
+            for offset in grid.offsets:
+                neighbor = node + offset
+                if cells[neighbor] and self.g.get(neighbor, INF) < best:
+                    best = self.g[neighbor]
+                    following = neighbor
+            node = following
+            path.append(grid.coords(node))
+        return path, expanded
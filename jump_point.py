@@ -0,0 +1,140 @@
+from typing import Dict, List, Tuple, Optional
+import heapq
+
+from algorithm import GridGraph, SearchStats, _finish, _start_clock
+
+
+def _jump_horizontal(cells: bytearray, node: int, step: int, stride: int, target: int) -> int:
+    while True:
+        node += step
+        if not cells[node]:
+            return -1
+        if node == target:
+            return node
+        if ((cells[node - stride] and not cells[node - stride - step]) or
+                (cells[node + stride] and not cells[node + stride - step])):
+            return node
+
+
+def _jump_vertical(cells: bytearray, node: int, step: int, stride: int, target: int) -> int:
+    while True:
+        node += step
+        if not cells[node]:
+            return -1
+        if node == target:
+            return node
+        if ((cells[node - 1] and not cells[node - 1 - step]) or
+                (cells[node + 1] and not cells[node + 1 - step])):
+            return node
+        if (_jump_horizontal(cells, node, 1, stride, target) != -1 or
+                _jump_horizontal(cells, node, -1, stride, target) != -1):
+            return node
+
+
+def _expand_jumps(grid: GridGraph, parent: Dict[int, int], target: int) -> List[Tuple[int, int]]:
+    stride = grid.stride
+    path = [grid.coords(target)]
+    node = target
+    while parent[node] != -1:
+        previous = parent[node]
+        step = 1 if abs(node - previous) < stride else stride
+        if previous > node:
+            step = -step
+        while node != previous:
+            node -= step
+            path.append(grid.coords(node))
+    return path[::-1]
+
+
+def jump_point_search(grid: GridGraph,
+                      start: Tuple[int, int],
+                      end: Tuple[int, int],
+                      stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """
+    Jump Point Search для 4-связной сетки с единичной стоимостью шага.
+    В очередь попадают только точки прыжка, путь между ними достраивается отрезками.
+    Возвращает: (путь, количество раскрытых точек прыжка)
+    """
+
+    if grid.connectivity != 4:
+        raise ValueError("Jump Point Search supports 4-connected grids only")
+
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        return None, 0
+
+    if start == end:
+        return [start], 1
+
+    if grid.unreachable(start, end):
+        return None, 0
+
+    cells = grid.cells
+    stride = grid.stride
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    open_set = [(0, source)]
+    parent = {source: -1}
+    g_score = {source: 0}
+    closed = set()
+    visited_count = 0
+    pushes = 1
+    heap_peak = 1
+    reopened = 0
+
+    while open_set:
+        if len(open_set) > heap_peak:
+            heap_peak = len(open_set)
+        current_f, current = heapq.heappop(open_set)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
+
+        if current == target:
+            return _finish(stats, began, (visited_count, pushes, heap_peak, reopened),
+                           _expand_jumps, grid, parent, target), visited_count
+
+        previous = parent[current]
+        if previous == -1:
+            steps = (-stride, stride, -1, 1)
+        elif abs(current - previous) < stride:
+            forward = 1 if current > previous else -1
+            steps = (forward, -stride, stride)
+        else:
+            forward = stride if current > previous else -stride
+            steps = (forward, -1, 1)
+
+        for step in steps:
+            if step == 1 or step == -1:
+                jump = _jump_horizontal(cells, current, step, stride, target)
+                if jump == -1:
+                    continue
+                distance = abs(jump - current)
+            else:
+                jump = _jump_vertical(cells, current, step, stride, target)
+                if jump == -1:
+                    continue
+                distance = abs(jump - current) // stride
+
+            new_g = g_score[current] + distance
+            if jump not in g_score or new_g < g_score[jump]:
+                if jump in g_score:
+                    reopened += 1
+                g_score[jump] = new_g
+                parent[jump] = current
+                row, col = divmod(jump, stride)
+                heapq.heappush(open_set, (new_g + abs(row - end_row) + abs(col - end_col), jump))
+                pushes += 1
+                if on_push is not None:
+                    on_push(row - 1, col - 1)
+
+    return _finish(stats, began, (visited_count, pushes, heap_peak, reopened)), visited_count
@@ -0,0 +1,160 @@
+from array import array
+from typing import Callable, Dict, List, Tuple, Optional
+import random
+
+from algorithm import GridGraph, SearchStats, a_star_shortest_path, bfs_distance_field
+from components import ComponentIndex
+
+
+STRATEGIES = ("farthest", "random", "corners")
+
+
+class LandmarkOracle:
+    """
+    Предвычисление ALT: для каждого ориентира хранится поле BFS-расстояний
+    (int32 на клетку). По неравенству треугольника |d(L, t) - d(L, n)| - нижняя
+    оценка d(n, t); максимум по ориентирам и манхэттенскому расстоянию
+    даёт согласованную эвристику для A*.
+    Стратегии выбора: "farthest" - каждый следующий ориентир максимально
+    удалён от уже выбранных в наибольшей связной области, "random" -
+    случайные свободные клетки, "corners" - свободные клетки, ближайшие
+    к углам и серединам сторон.
+    Поля BFS 4-связные, поэтому для 8-связной сетки оценка не допустима
+    и такая сетка отклоняется. Поля относятся к версии сетки grid.version
+    на момент build(); после изменения сетки heuristic_for() строит их заново.
+    """
+
+    def __init__(self, grid: GridGraph, count: int = 8,
+                 strategy: str = "farthest", seed: int = 0):
+
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown landmark strategy {strategy!r}, expected one of {STRATEGIES}")
+        if grid.connectivity != 4:
+            raise ValueError("Landmark distances are 4-connected, ALT needs a 4-connected grid")
+
+        self.grid = grid
+        self.count = count
+        self.strategy = strategy
+        self.seed = seed
+        self.build()
+
+    def build(self) -> None:
+        """Выбор ориентиров и построение полей расстояний по текущей сетке"""
+
+        grid = self.grid
+        self.version = grid.version
+        self.landmarks: List[Tuple[int, int]] = []
+        self.fields: List[array] = []
+        count = self.count
+        strategy = self.strategy
+        free = [index for index in range(grid.size) if grid.cells[index]]
+        if not free:
+            return
+
+        rng = random.Random(self.seed)
+        if strategy == "random":
+            for index in rng.sample(free, min(count, len(free))):
+                self._add(grid.coords(index))
+        elif strategy == "corners":
+            for row, col in self._border_points()[:count]:
+                self._add(self._nearest_free(row, col))
+        else:
+            self._farthest(count, rng)
+
+    def _add(self, landmark: Optional[Tuple[int, int]]) -> None:
+        if landmark is None or landmark in self.landmarks:
+            return
+        distances, _ = bfs_distance_field(self.grid, landmark)
+        self.landmarks.append(landmark)
+        self.fields.append(distances)
+
+    def _border_points(self) -> List[Tuple[int, int]]:
+        last_row = self.grid.rows - 1
+        last_col = self.grid.cols - 1
+        return [(0, 0), (last_row, last_col), (0, last_col), (last_row, 0),
+                (0, last_col // 2), (last_row, last_col // 2),
+                (last_row // 2, 0), (last_row // 2, last_col)]
+
+    def _nearest_free(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        grid = self.grid
+        for radius in range(max(grid.rows, grid.cols)):
+            for r in range(row - radius, row + radius + 1):
+                for c in range(col - radius, col + radius + 1):
+                    if abs(r - row) + abs(c - col) <= radius and grid.is_valid(r, c):
+                        return r, c
+        return None
+
+    def _farthest(self, count: int, rng: random.Random) -> None:
+        # Затравка - клетка наибольшей связной области (разметка компонент
+        # сетки или одна разметка здесь же)
+        grid = self.grid
+        components = grid.components
+        if components is None:
+            components = ComponentIndex(grid)
+            components.detach()
+        region = components.cells_of(components.largest())
+        nearest, _ = bfs_distance_field(grid, grid.coords(rng.choice(region)))
+        for _ in range(count):
+            best = max(range(grid.size), key=nearest.__getitem__)
+            if nearest[best] <= 0:
+                break
+            self._add(grid.coords(best))
+            field = self.fields[-1]
+            nearest = array('i', (min(a, b) if b >= 0 else a for a, b in zip(nearest, field)))
+
+    def heuristic_for(self, end: Tuple[int, int]) -> Callable[[int], int]:
+        """Оценка расстояния до end по индексу клетки для a_star_shortest_path(estimate=...)"""
+
+        grid = self.grid
+        if grid.version != self.version:
+            self.build()
+        stride = grid.stride
+        target = grid.index(end[0], end[1])
+        end_row, end_col = divmod(target, stride)
+        pairs = [(field, field[target]) for field in self.fields if field[target] >= 0]
+
+        def estimate(node: int) -> int:
+            row, col = divmod(node, stride)
+            best = abs(row - end_row) + abs(col - end_col)
+            for field, to_target in pairs:
+                to_node = field[node]
+                if to_node < 0:
+                    continue
+                bound = to_target - to_node if to_target > to_node else to_node - to_target
+                if bound > best:
+                    best = bound
+            return best
+
+        return estimate
+
+
+def alt_shortest_path(oracle: LandmarkOracle,
+                      start: Tuple[int, int],
+                      end: Tuple[int, int],
+                      stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """A* с эвристикой ALT. Возвращает: (путь, количество посещённых клеток)"""
+
+    if not oracle.grid.is_valid(end[0], end[1]):
+        return None, 0
+    return a_star_shortest_path(oracle.grid, start, end, estimate=oracle.heuristic_for(end), stats=stats)
+
+
+def expansion_report(oracle: LandmarkOracle,
+                     queries: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Dict[str, float]:
+    """Сравнение числа раскрытых клеток A* с ALT и с манхэттенской эвристикой"""
+
+    manhattan_expanded = 0
+    alt_expanded = 0
+    for start, end in queries:
+        _, visited = a_star_shortest_path(oracle.grid, start, end)
+        manhattan_expanded += visited
+        _, visited = alt_shortest_path(oracle, start, end)
+        alt_expanded += visited
+
+    return {
+        "queries": len(queries),
+        "landmarks": len(oracle.landmarks),
+        "manhattan_expanded": manhattan_expanded,
+        "alt_expanded": alt_expanded,
+        "reduction": 1 - alt_expanded / manhattan_expanded if manhattan_expanded else 0.0,
+    }
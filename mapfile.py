@@ -0,0 +1,134 @@
+from typing import Optional
+import mmap
+import struct
+
+from algorithm import GridGraph
+
+
+MAGIC = b"PFGRID\x00\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHII")
+HEADER_SIZE = 32
+
+FLAG_COSTS = 1
+FLAG_EIGHT_CONNECTED = 2
+FLAG_CORNER_CUTTING = 4
+
+PASSABLE = b".GS"
+_TO_CELLS = bytes(GridGraph.FREE if chr(code).encode() in PASSABLE else GridGraph.BLOCKED
+                  for code in range(256))
+_TO_ASCII = bytes.maketrans(bytes([GridGraph.BLOCKED, GridGraph.FREE]), b"@.")
+
+_ACCESS = {"r": mmap.ACCESS_READ, "c": mmap.ACCESS_COPY, "w": mmap.ACCESS_WRITE}
+
+
+def save_grid(grid: GridGraph, path: str) -> None:
+    """
+    Запись сетки в двоичный формат: заголовок HEADER_SIZE байт, затем cells
+    и необязательный слой стоимостей в той же раскладке с рамкой, что и
+    в памяти (байт на клетку), поэтому открытие не требует распаковки.
+    """
+
+    flags = 0
+    if grid.costs is not None:
+        flags |= FLAG_COSTS
+    if grid.connectivity == 8:
+        flags |= FLAG_EIGHT_CONNECTED
+    if grid.corner_cutting:
+        flags |= FLAG_CORNER_CUTTING
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, grid.rows, grid.cols)
+    with open(path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\x00"))
+        file.write(grid.cells)
+        if grid.costs is not None:
+            file.write(grid.costs)
+
+
+def open_grid(path: str, mode: str = "c") -> GridGraph:
+    """
+    Открытие двоичной карты через mmap без копирования: cells и costs сетки -
+    представления отображённого файла, страницы читаются при первом обращении.
+    mode: "r" - только чтение, "c" - изменения сетки остаются в памяти
+    процесса (копирование при записи), "w" - изменения пишутся в файл.
+    """
+
+    if mode not in _ACCESS:
+        raise ValueError(f"Unknown map open mode {mode!r}, expected one of {sorted(_ACCESS)}")
+
+    with open(path, "r+b" if mode == "w" else "rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=_ACCESS[mode])
+
+    if len(mapping) < HEADER_SIZE:
+        raise ValueError(f"{path}: file is too short for a grid header")
+    magic, version, flags, rows, cols = HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a grid map file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported grid format version {version}")
+
+    size = (rows + 2) * (cols + 2)
+    layers = 2 if flags & FLAG_COSTS else 1
+    if len(mapping) != HEADER_SIZE + layers * size:
+        raise ValueError(f"{path}: expected {HEADER_SIZE + layers * size} bytes, found {len(mapping)}")
+
+    view = memoryview(mapping)
+    cells = view[HEADER_SIZE:HEADER_SIZE + size]
+    costs = view[HEADER_SIZE + size:] if flags & FLAG_COSTS else None
+    return GridGraph.from_buffer(rows, cols, cells, costs,
+                                 connectivity=8 if flags & FLAG_EIGHT_CONNECTED else 4,
+                                 corner_cutting=bool(flags & FLAG_CORNER_CUTTING))
+
+
+def read_ascii_map(path: str, connectivity: Optional[int] = None) -> GridGraph:
+    """
+    Импорт карты в текстовом формате .map (Moving AI): заголовок type/height/
+    width/map, затем строки клеток. Проходимы '.', 'G' и 'S', остальные
+    символы ('@', 'O', 'T', 'W') - препятствия.
+    connectivity по умолчанию 8 для type octile и 4 для прочих типов.
+    """
+
+    with open(path, "rb") as file:
+        fields = {}
+        for line in file:
+            line = line.strip()
+            if line == b"map":
+                break
+            if line:
+                key, _, value = line.partition(b" ")
+                fields[key.decode()] = value.strip().decode()
+        else:
+            raise ValueError(f"{path}: missing 'map' line")
+
+        try:
+            rows = int(fields["height"])
+            cols = int(fields["width"])
+        except (KeyError, ValueError):
+            raise ValueError(f"{path}: header must give integer height and width")
+        if connectivity is None:
+            connectivity = 8 if fields.get("type") == "octile" else 4
+
+        grid = GridGraph.from_buffer(rows, cols, bytearray((rows + 2) * (cols + 2)),
+                                     connectivity=connectivity)
+        cells = grid.cells
+        stride = grid.stride
+        for row in range(rows):
+            line = file.readline().rstrip(b"\r\n")
+            if len(line) != cols:
+                raise ValueError(f"{path}: row {row} has {len(line)} cells, expected {cols}")
+            base = (row + 1) * stride + 1
+            cells[base:base + cols] = line.translate(_TO_CELLS)
+
+    return grid
+
+
+def write_ascii_map(grid: GridGraph, path: str) -> None:
+    """Экспорт в текстовый формат .map; слой стоимостей не сохраняется"""
+
+    stride = grid.stride
+    with open(path, "wb") as file:
+        kind = b"octile" if grid.connectivity == 8 else b"tile"
+        file.write(b"type %s\nheight %d\nwidth %d\nmap\n" % (kind, grid.rows, grid.cols))
+        for row in range(grid.rows):
+            base = (row + 1) * stride + 1
+            file.write(bytes(grid.cells[base:base + grid.cols]).translate(_TO_ASCII) + b"\n")
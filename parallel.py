@@ -0,0 +1,181 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import os
+import struct
+import time
+
+from algorithm import GridGraph, SearchWorkspace, a_star_shortest_path, bfs_shortest_path
+
+
+_HEADER = struct.Struct("<QB")
+_HEADER_SIZE = 16
+_WORKSPACE_SEARCHES = (a_star_shortest_path, bfs_shortest_path)
+_MAX_ATTACHED = 8
+
+_attached: Dict[str, "_AttachedGrid"] = {}
+
+
+class SharedGrid:
+    """
+    Копия буфера сетки в разделяемой памяти: заголовок (версия, есть ли
+    слой стоимостей), затем cells и costs по grid.size байт.
+    Воркеры подключаются к блоку по имени один раз (до _MAX_ATTACHED блоков
+    на процесс) и читают cells напрямую, без копирования; sync() переносит
+    изменения сетки одной записью буфера.
+    """
+
+    def __init__(self, grid: GridGraph):
+
+        self.grid = grid
+        self.memory = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + 2 * grid.size)
+        self.version = -1
+        self.sync()
+
+    def spec(self) -> Tuple[str, int, int, int, bool]:
+        """Параметры для подключения воркера к блоку"""
+        grid = self.grid
+        return self.memory.name, grid.rows, grid.cols, grid.connectivity, grid.corner_cutting
+
+    def sync(self) -> None:
+        """Копирование сетки в блок, если она изменилась с прошлой синхронизации"""
+        grid = self.grid
+        if grid.version == self.version:
+            return
+        buffer = self.memory.buf
+        cells_start = _HEADER_SIZE
+        costs_start = cells_start + grid.size
+        buffer[cells_start:costs_start] = grid.cells
+        if grid.costs is not None:
+            buffer[costs_start:costs_start + grid.size] = grid.costs
+        _HEADER.pack_into(buffer, 0, grid.version, grid.costs is not None)
+        self.version = grid.version
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+class _AttachedGrid:
+    """Сетка воркера поверх блока SharedGrid; cells - представление блока"""
+
+    def __init__(self, spec: Tuple[str, int, int, int, bool]):
+
+        name, rows, cols, connectivity, corner_cutting = spec
+        self.memory = shared_memory.SharedMemory(name=name)
+        size = (rows + 2) * (cols + 2)
+        self.grid = GridGraph.from_buffer(rows, cols, self.memory.buf[_HEADER_SIZE:_HEADER_SIZE + size],
+                                          connectivity=connectivity, corner_cutting=corner_cutting)
+        self.workspace = SearchWorkspace(self.grid)
+        self.version = -1
+
+    def refresh(self) -> GridGraph:
+        grid = self.grid
+        version, has_costs = _HEADER.unpack_from(self.memory.buf, 0)
+        if version != self.version:
+            costs_start = _HEADER_SIZE + grid.size
+            grid.costs = bytearray(self.memory.buf[costs_start:costs_start + grid.size]) if has_costs else None
+            grid.version = version
+            grid.cost_version = version
+            self.version = version
+        return grid
+
+    def close(self) -> None:
+        self.grid.cells.release()
+        self.memory.close()
+
+
+def _attach(spec: Tuple[str, int, int, int, bool]) -> "_AttachedGrid":
+    entry = _attached.get(spec[0])
+    if entry is None:
+        if len(_attached) >= _MAX_ATTACHED:
+            _attached.pop(next(iter(_attached))).close()
+        entry = _attached[spec[0]] = _AttachedGrid(spec)
+    return entry
+
+
+def _solve_chunk(spec: Tuple[str, int, int, int, bool], search: Callable, first: int,
+                 pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                 **options) -> Tuple[int, List[Any]]:
+    entry = _attach(spec)
+    grid = entry.refresh()
+    if search in _WORKSPACE_SEARCHES:
+        options["workspace"] = entry.workspace
+    return first, [search(grid, start, end, **options) for start, end in pairs]
+
+
+class BatchSolver:
+    """
+    Пакетный поиск в пуле процессов. Сетка передаётся воркерам один раз
+    через разделяемую память (SharedGrid), задачами уходят только пары
+    (start, end) порциями по chunksize. Воркер подключается к блоку при
+    старте и держит для сетки свой SearchWorkspace. search - функция уровня модуля (передаётся по имени),
+    результаты такие же, как у search(grid, start, end).
+    Изменения сетки между вызовами map/as_completed синхронизируются
+    автоматически; во время выполнения пакета сетку менять нельзя.
+    """
+
+    def __init__(self, grid: GridGraph,
+                 workers: Optional[int] = None,
+                 search: Callable = a_star_shortest_path,
+                 chunksize: int = 64):
+
+        if chunksize < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunksize}")
+
+        self.grid = grid
+        self.search = search
+        self.chunksize = chunksize
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = SharedGrid(grid)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            initializer=_attach,
+                                            initargs=(self.shared.spec(),))
+
+    def __enter__(self) -> "BatchSolver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Остановка пула и освобождение разделяемой памяти"""
+        self.executor.shutdown()
+        self.shared.close()
+
+    def _submit(self, pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> list:
+        self.shared.sync()
+        spec = self.shared.spec()
+        return [self.executor.submit(_solve_chunk, spec, self.search, first, pairs[first:first + self.chunksize])
+                for first in range(0, len(pairs), self.chunksize)]
+
+    def map(self, pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Iterator[Any]:
+        """Результаты в порядке pairs; выдаются по мере готовности порций"""
+        pairs = list(pairs)
+        for future in self._submit(pairs):
+            _, results = future.result()
+            yield from results
+
+    def as_completed(self, pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]]) -> Iterator[Tuple[int, Any]]:
+        """Пары (номер запроса, результат) в порядке завершения порций"""
+        pairs = list(pairs)
+        for future in as_completed(self._submit(pairs)):
+            first, results = future.result()
+            for offset, result in enumerate(results):
+                yield first + offset, result
+
+
+def throughput(grid: GridGraph,
+               pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+               workers: int,
+               search: Callable = a_star_shortest_path,
+               chunksize: int = 64) -> float:
+    """Запросов в секунду для пула из workers процессов (без учёта запуска пула)"""
+
+    with BatchSolver(grid, workers=workers, search=search, chunksize=chunksize) as solver:
+        list(solver.map(pairs[:workers]))
+        began = time.perf_counter()
+        for _ in solver.map(pairs):
+            pass
+        elapsed = time.perf_counter() - began
+    return len(pairs) / elapsed if elapsed > 0 else float("inf")
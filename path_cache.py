@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+from algorithm import GridGraph, a_star_shortest_path
+
+
+def _reverse_result(result: Any) -> Any:
+    if isinstance(result, tuple):
+        path, visited_count = result
+        return (path[::-1] if path is not None else None), visited_count
+    return result[::-1] if result is not None else None
+
+
+class PathCache:
+    """
+    LRU-кэш результатов поиска. Ключ - (версия сетки, функция поиска, start, end),
+    поэтому любое изменение сетки через её методы делает старые записи
+    недостижимыми, а вытеснение убирает их по мере заполнения.
+    На сетках без слоя стоимостей путь симметричен, и запрос (end, start)
+    отвечается развёрнутым результатом (start, end).
+    """
+
+    def __init__(self, capacity: int = 1024):
+
+        self.capacity = capacity
+        self.entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, grid: GridGraph,
+             start: Tuple[int, int],
+             end: Tuple[int, int],
+             search: Callable = a_star_shortest_path,
+             **options) -> Any:
+        """
+        Результат search(grid, start, end) из кэша или после вычисления.
+        options передаются в search и не входят в ключ, поэтому не должны
+        влиять на результат (workspace, крючки отслеживания).
+        """
+
+        key = (grid.version, search, start, end)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if grid.costs is None:
+            reverse_key = (grid.version, search, end, start)
+            if reverse_key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(reverse_key)
+                return _reverse_result(self.entries[reverse_key])
+
+        self.misses += 1
+        result = search(grid, start, end, **options)
+        self.entries[key] = result
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,372 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from algorithm import (GridGraph, SearchBudgetExceeded, SearchStats, a_star_shortest_path, bfs_shortest_path,
+                       bidirectional_a_star, bidirectional_bfs)
+from jump_point import jump_point_search
+from parallel import SharedGrid, _solve_chunk
+from weighted import dijkstra_shortest_path, weighted_a_star_shortest_path
+
+
+ALGORITHMS = {
+    "a_star": a_star_shortest_path,
+    "bfs": bfs_shortest_path,
+    "bidirectional_bfs": bidirectional_bfs,
+    "bidirectional_a_star": bidirectional_a_star,
+    "jps": jump_point_search,
+    "dijkstra": dijkstra_shortest_path,
+    "weighted_a_star": weighted_a_star_shortest_path,
+}
+BUDGETED_ALGORITHMS = ("a_star",)
+EIGHT_CONNECTED_ALGORITHMS = ("a_star", "bfs")
+
+LINE_LIMIT = 64 * 1024 * 1024
+DEADLINE_CHECK_INTERVAL = 1024
+
+
+class RequestError(Exception):
+    """Некорректный запрос клиента; текст уходит в поле error ответа"""
+
+
+class SearchTimeout(Exception):
+    """Поиск в воркере остановлен по истечении timeout запроса"""
+
+
+def _deadline_hook(deadline: float):
+    # on_expand: проверка времени раз в DEADLINE_CHECK_INTERVAL раскрытий
+    counter = itertools.count(1)
+
+    def check(row: int, col: int) -> None:
+        if next(counter) % DEADLINE_CHECK_INTERVAL == 0 and time.time() >= deadline:
+            raise SearchTimeout()
+
+    return check
+
+
+def _solve_until(deadline: Optional[float], spec: Tuple[str, int, int, int, bool], search,
+                 start: Tuple[int, int], end: Tuple[int, int], **options) -> Any:
+    """Поиск в воркере с ограничением по времени: запрос, дождавшийся воркера
+    после deadline, не запускается, а поиск прерывается через on_expand"""
+    if deadline is not None:
+        if time.time() >= deadline:
+            raise SearchTimeout()
+        options["stats"] = SearchStats(on_expand=_deadline_hook(deadline))
+    _, (result,) = _solve_chunk(spec, search, 0, [(start, end)], **options)
+    return result
+
+
+def _cell(message: Dict[str, Any], field: str) -> Tuple[int, int]:
+    value = message.get(field)
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(v, int) for v in value)):
+        raise RequestError(f"Field {field!r} must be [row, col]")
+    return value[0], value[1]
+
+
+def _cells(message: Dict[str, Any], field: str) -> List[Tuple[int, int]]:
+    value = message.get(field, [])
+    if not (isinstance(value, list) and
+            all(isinstance(cell, list) and len(cell) == 2 and all(isinstance(v, int) for v in cell)
+                for cell in value)):
+        raise RequestError(f"Field {field!r} must be a list of [row, col]")
+    return [(row, col) for row, col in value]
+
+
+class PathfindingServer:
+    """
+    Сервер запросов поиска пути: TCP на localhost, по одному JSON-объекту
+    на строку в обе стороны, ответ несёт id запроса.
+    Операции: load (сетка по rows/cols/obstacles/costs), update (block/free
+    клеток), unload, find (grid, start, end, algorithm, timeout,
+    max_expansions), stats.
+    Сетки хранятся в памяти сервера и копируются в SharedGrid; поиск
+    выполняется в пуле процессов, цикл событий только ждёт результат.
+    update применяет изменения к новому блоку разделяемой памяти, поэтому
+    уже запущенные поиски дочитывают прежнюю версию сетки.
+    Одинаковые одновременные запросы (сетка и её версия, алгоритм, start,
+    end, лимит раскрытий, timeout) выполняются один раз. timeout ограничивает
+    и ожидание в очереди пула, и сам поиск: воркер прерывает его по сроку
+    и освобождается для следующих запросов.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.grids: Dict[str, GridGraph] = {}
+        self.shared: Dict[str, SharedGrid] = {}
+        self.retired: List[SharedGrid] = []
+        self.in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.counters = {"requests": 0, "searches": 0, "coalesced": 0,
+                         "timeouts": 0, "budget_exceeded": 0, "errors": 0}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Запуск приёма соединений; возвращает фактический порт"""
+        self.server = await asyncio.start_server(self._handle_client, host, port, limit=LINE_LIMIT)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            for writer in self.clients.values():
+                writer.close()
+            if self.clients:
+                await asyncio.gather(*self.clients, return_exceptions=True)
+            await self.server.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+        for shared in list(self.shared.values()) + self.retired:
+            shared.close()
+        self.shared.clear()
+        self.retired.clear()
+
+    def load_grid(self, name: str, grid: GridGraph) -> None:
+        """Регистрация сетки под именем name (заменяет прежнюю)"""
+        self.grids[name] = grid
+        self._publish(name)
+
+    def _publish(self, name: str) -> None:
+        old = self.shared.get(name)
+        self.shared[name] = SharedGrid(self.grids[name])
+        if old is not None:
+            self._retire(old)
+
+    def _retire(self, shared: SharedGrid) -> None:
+        self.retired.append(shared)
+        self._release_retired()
+
+    def _release_retired(self) -> None:
+        busy = {key[0] for key in self.in_flight}
+        still_used = []
+        for shared in self.retired:
+            if shared.memory.name in busy:
+                still_used.append(shared)
+            else:
+                shared.close()
+        self.retired = still_used
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks = set()
+        handler = asyncio.current_task()
+        self.clients[handler] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            del self.clients[handler]
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        self.counters["requests"] += 1
+        request_id = None
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise RequestError("Request must be a JSON object")
+            request_id = message.get("id")
+            response = await self.dispatch(message)
+        except (RequestError, json.JSONDecodeError) as error:
+            self.counters["errors"] += 1
+            response = {"ok": False, "error": str(error)}
+        except Exception as error:
+            # Ошибка сервера или пула (например, BrokenProcessPool) - клиент всё равно получает ответ
+            self.counters["errors"] += 1
+            response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        response["id"] = request_id
+
+        async with lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполнение одного запроса; ответ без поля id"""
+
+        op = message.get("op")
+        if op == "find":
+            return await self._find(message)
+        if op == "stats":
+            return {"ok": True, "grids": sorted(self.grids), "in_flight": len(self.in_flight), **self.counters}
+
+        name = message.get("grid")
+        if not isinstance(name, str):
+            raise RequestError("Field 'grid' must be a grid name")
+
+        if op == "load":
+            rows, cols = message.get("rows"), message.get("cols")
+            if not (isinstance(rows, int) and isinstance(cols, int) and rows > 0 and cols > 0):
+                raise RequestError("Fields 'rows' and 'cols' must be positive integers")
+            try:
+                grid = GridGraph(rows, cols,
+                                 obstacles=[tuple(cell) for cell in message.get("obstacles", [])],
+                                 costs={(row, col): cost for row, col, cost in message.get("costs", [])},
+                                 connectivity=message.get("connectivity", 4),
+                                 corner_cutting=bool(message.get("corner_cutting", False)))
+            except (TypeError, ValueError) as error:
+                raise RequestError(str(error))
+            self.load_grid(name, grid)
+            return {"ok": True, "grid": name, "version": grid.version}
+
+        grid = self.grids.get(name)
+        if grid is None:
+            raise RequestError(f"Unknown grid {name!r}")
+
+        if op == "update":
+            # Все клетки проверяются до первого изменения: сетка и её копия
+            # в разделяемой памяти не расходятся из-за ошибки в середине списка
+            block = _cells(message, "block")
+            free = _cells(message, "free")
+            for row, col in block:
+                grid.add_obstacle(row, col)
+            for row, col in free:
+                grid.remove_obstacle(row, col)
+            self._publish(name)
+            return {"ok": True, "grid": name, "version": grid.version}
+
+        if op == "unload":
+            del self.grids[name]
+            self._retire(self.shared.pop(name))
+            return {"ok": True, "grid": name}
+
+        raise RequestError(f"Unknown op {op!r}")
+
+    async def _find(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        name = message.get("grid")
+        if not isinstance(name, str):
+            raise RequestError("Field 'grid' must be a grid name")
+        if name not in self.grids:
+            raise RequestError(f"Unknown grid {name!r}")
+        start = _cell(message, "start")
+        end = _cell(message, "end")
+        algorithm = message.get("algorithm", "a_star")
+        if algorithm not in ALGORITHMS:
+            raise RequestError(f"Unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}")
+        if self.grids[name].connectivity != 4 and algorithm not in EIGHT_CONNECTED_ALGORITHMS:
+            raise RequestError(f"Algorithm {algorithm!r} supports 4-connected grids only")
+        timeout = message.get("timeout")
+        if timeout is not None and not (isinstance(timeout, (int, float)) and timeout > 0):
+            raise RequestError("Field 'timeout' must be a positive number of seconds")
+        max_expansions = message.get("max_expansions")
+        options = {}
+        if max_expansions is not None:
+            if not (isinstance(max_expansions, int) and max_expansions > 0):
+                raise RequestError("Field 'max_expansions' must be a positive integer")
+            if algorithm not in BUDGETED_ALGORITHMS:
+                raise RequestError(f"Algorithm {algorithm!r} does not support max_expansions")
+            options["max_expansions"] = max_expansions
+
+        shared = self.shared[name]
+        key = (shared.memory.name, shared.version, algorithm, start, end, max_expansions, timeout)
+        future = self.in_flight.get(key)
+        if future is None:
+            self.counters["searches"] += 1
+            deadline = time.time() + timeout if timeout is not None else None
+            future = asyncio.wrap_future(self.executor.submit(
+                _solve_until, deadline, shared.spec(), ALGORITHMS[algorithm], start, end, **options))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.counters["coalesced"] += 1
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, SearchTimeout):
+            self.counters["timeouts"] += 1
+            return {"ok": False, "error": "time budget exceeded"}
+        except SearchBudgetExceeded as error:
+            self.counters["budget_exceeded"] += 1
+            return {"ok": False, "error": "expansion budget exceeded", "visited": error.expanded}
+
+        if isinstance(result, tuple):
+            path, visited = result
+        else:
+            path, visited = result, None
+        return {"ok": True, "path": path, "visited": visited}
+
+    def _finish(self, key: Tuple, future: asyncio.Future) -> None:
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+        if not future.cancelled():
+            future.exception()
+        if self.retired:
+            self._release_retired()
+
+
+class PathfindingClient:
+    """
+    Клиент PathfindingServer: request() отправляет запрос и ждёт ответа
+    с тем же id, поэтому запросы можно выполнять одновременно.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "PathfindingClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Server closed the connection"))
+            self.pending.clear()
+
+    async def request(self, op: str, **fields) -> Dict[str, Any]:
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, workers: Optional[int] = None) -> None:
+    server = PathfindingServer(workers)
+    await server.start(host, port)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pathfinding NDJSON server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+    asyncio.run(serve(arguments.host, arguments.port, arguments.workers))
@@ -0,0 +1,253 @@
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+import heapq
+import time
+
+from algorithm import (GridGraph, SearchWorkspace, _corner_open, _walk_directions, _workspace_for,
+                       _F_SHIFT, _G_SHIFT, _NODE_MASK)
+
+
+class SearchProgress:
+    """
+    Состояние пошагового поиска после очередной порции раскрытий.
+    closed/opened - клетки, закрытые и добавленные во фронт с прошлого шага;
+    best - закрытая клетка, ближайшая к цели по манхэттенскому расстоянию.
+    partial_path() ведёт к best и остаётся верным и после продолжения поиска,
+    пока workspace не отдан другому поиску. После done path - итоговый путь
+    (None, если пути нет).
+    """
+
+    def __init__(self, grid: GridGraph, parents: Optional[bytearray], source: int, best: int,
+                 expanded: int, frontier_size: int,
+                 closed: List[int], opened: List[int],
+                 done: bool = False, path: Optional[List[Tuple[int, int]]] = None):
+
+        self.grid = grid
+        self.parents = parents
+        self.source = source
+        self.best = best
+        self.expanded = expanded
+        self.frontier_size = frontier_size
+        self._closed = closed
+        self._opened = opened
+        self.done = done
+        self.path = path
+
+    @property
+    def closed(self) -> List[Tuple[int, int]]:
+        return [self.grid.coords(index) for index in self._closed]
+
+    @property
+    def opened(self) -> List[Tuple[int, int]]:
+        return [self.grid.coords(index) for index in self._opened]
+
+    def partial_path(self) -> List[Tuple[int, int]]:
+        """Лучший на данный момент частичный путь от start"""
+        if self.path is not None:
+            return self.path
+        if self.best < 0:
+            return []
+        return _walk_directions(self.grid, self.parents, self.source, self.best)
+
+
+def _finished(grid: GridGraph, path: Optional[List[Tuple[int, int]]], expanded: int = 0) -> SearchProgress:
+    return SearchProgress(grid, None, -1, -1, expanded, 0, [], [], done=True, path=path)
+
+
+def bfs_steps(grid: GridGraph,
+              start: Tuple[int, int],
+              end: Tuple[int, int],
+              budget: int = 256,
+              workspace: Optional[SearchWorkspace] = None) -> Iterator[SearchProgress]:
+    """
+    BFS, отдающий SearchProgress после каждых budget раскрытых клеток.
+    Последний элемент имеет done=True; close() генератора отменяет поиск.
+    Пути совпадают с bfs_shortest_path.
+    """
+
+    if budget < 1:
+        raise ValueError(f"Step budget must be positive, got {budget}")
+
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        yield _finished(grid, None)
+        return
+
+    if start == end:
+        yield _finished(grid, [start], 1)
+        return
+
+    if grid.unreachable(start, end):
+        yield _finished(grid, None)
+        return
+
+    workspace = _workspace_for(grid, workspace)
+    generation = workspace.begin()
+    stamps = workspace.stamps
+    parents = workspace.parents
+    cells = grid.cells
+    stride = grid.stride
+    moves = list(enumerate(grid.moves))
+    corner_cutting = grid.corner_cutting
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+
+    queue = deque([source])
+    stamps[source] = generation
+    best = -1
+    best_h = grid.rows + grid.cols
+    expanded = 0
+    closed: List[int] = []
+    opened: List[int] = [source]
+
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        closed.append(current)
+        row, col = divmod(current, stride)
+        h = abs(row - end_row) + abs(col - end_col)
+        if h < best_h:
+            best, best_h = current, h
+
+        if current == target:
+            yield SearchProgress(grid, parents, source, target, expanded, len(queue), closed, opened,
+                                 done=True, path=_walk_directions(grid, parents, source, target))
+            return
+
+        for direction, (offset, _, side_a, side_b) in moves:
+            neighbor = current + offset
+            if not cells[neighbor] or stamps[neighbor] >= generation:
+                continue
+            if side_b and not _corner_open(cells, current, side_a, side_b, corner_cutting):
+                continue
+            stamps[neighbor] = generation
+            parents[neighbor] = direction
+            queue.append(neighbor)
+            opened.append(neighbor)
+
+        if len(closed) == budget:
+            yield SearchProgress(grid, parents, source, best, expanded, len(queue), closed, opened)
+            closed = []
+            opened = []
+
+    yield SearchProgress(grid, parents, source, best, expanded, 0, closed, opened, done=True)
+
+
+def a_star_steps(grid: GridGraph,
+                 start: Tuple[int, int],
+                 end: Tuple[int, int],
+                 budget: int = 256,
+                 workspace: Optional[SearchWorkspace] = None,
+                 estimate: Optional[Callable[[int], int]] = None) -> Iterator[SearchProgress]:
+    """
+    A* для 4-связной сетки, отдающий SearchProgress после каждых budget
+    раскрытых клеток; очередь и порядок раскрытия как в a_star_shortest_path.
+    Последний элемент имеет done=True; close() генератора отменяет поиск.
+    """
+
+    if budget < 1:
+        raise ValueError(f"Step budget must be positive, got {budget}")
+    if grid.connectivity != 4:
+        raise ValueError("Stepwise A* supports 4-connected grids only")
+
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        yield _finished(grid, None)
+        return
+
+    if start == end:
+        yield _finished(grid, [start], 1)
+        return
+
+    if grid.unreachable(start, end):
+        yield _finished(grid, None)
+        return
+
+    workspace = _workspace_for(grid, workspace)
+    generation = workspace.begin()
+    closed_stamp = generation + 1
+    stamps = workspace.stamps
+    g_score = workspace.g_score
+    parents = workspace.parents
+    cells = grid.cells
+    stride = grid.stride
+    directions = list(enumerate(grid.offsets))
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+
+    def manhattan(node: int) -> int:
+        row, col = divmod(node, stride)
+        return abs(row - end_row) + abs(col - end_col)
+
+    estimate = estimate or manhattan
+    g_score[source] = 0
+    stamps[source] = generation
+    open_set = [(estimate(source) << _F_SHIFT) | (_NODE_MASK << _G_SHIFT) | source]
+    open_count = 1
+    best = -1
+    best_h = grid.rows + grid.cols
+    expanded = 0
+    closed: List[int] = []
+    opened: List[int] = [source]
+
+    while open_set:
+        current = heapq.heappop(open_set) & _NODE_MASK
+        if stamps[current] == closed_stamp:
+            continue
+
+        stamps[current] = closed_stamp
+        open_count -= 1
+        expanded += 1
+        closed.append(current)
+        h = manhattan(current)
+        if h < best_h:
+            best, best_h = current, h
+
+        if current == target:
+            yield SearchProgress(grid, parents, source, target, expanded, open_count, closed, opened,
+                                 done=True, path=_walk_directions(grid, parents, source, target))
+            return
+
+        new_g = g_score[current] + 1
+        g_key = (_NODE_MASK - new_g) << _G_SHIFT
+        for direction, offset in directions:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
+            stamp = stamps[neighbor]
+            if stamp < generation:
+                open_count += 1
+                opened.append(neighbor)
+            elif stamp == closed_stamp or g_score[neighbor] <= new_g:
+                continue
+            stamps[neighbor] = generation
+            g_score[neighbor] = new_g
+            parents[neighbor] = direction
+            heapq.heappush(open_set, ((new_g + estimate(neighbor)) << _F_SHIFT) | g_key | neighbor)
+
+        if len(open_set) > 2 * open_count + 64:
+            open_set = [entry for entry in open_set
+                        if stamps[entry & _NODE_MASK] == generation and
+                        _NODE_MASK - ((entry >> _G_SHIFT) & _NODE_MASK) == g_score[entry & _NODE_MASK]]
+            heapq.heapify(open_set)
+
+        if len(closed) == budget:
+            yield SearchProgress(grid, parents, source, best, expanded, open_count, closed, opened)
+            closed = []
+            opened = []
+
+    yield SearchProgress(grid, parents, source, best, expanded, 0, closed, opened, done=True)
+
+
+def advance(search: Iterator[SearchProgress], seconds: float) -> Optional[SearchProgress]:
+    """
+    Продолжение пошагового поиска в пределах seconds (бюджет кадра).
+    Возвращает последнее состояние; None, если генератор уже исчерпан.
+    """
+
+    deadline = time.perf_counter() + seconds
+    progress = None
+    for progress in search:
+        if progress.done or time.perf_counter() >= deadline:
+            break
+    return progress
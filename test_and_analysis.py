@@ -1,5 +1,31 @@
+import asyncio
+import heapq
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
 
-from algorithm import find_path, GridGraph, bfs_shortest_path
+from algorithm import (find_path, heuristic, find_paths, GridGraph, bfs_shortest_path, a_star_shortest_path,
+                       bfs_distance_field, path_from_field, reached_count,
+                       bidirectional_bfs, bidirectional_a_star, HEURISTICS, octile_distance,
+                       DIAGONAL_COST, SearchWorkspace, SearchStats)
+from jump_point import jump_point_search
+from hierarchical import HierarchicalGraph, hpa_star_shortest_path, suboptimality_report
+from incremental import IncrementalPlanner
+from weighted import dijkstra_shortest_path, weighted_a_star_shortest_path, path_cost
+from path_cache import PathCache
+from components import ComponentIndex
+from landmarks import LandmarkOracle, STRATEGIES, alt_shortest_path, expansion_report
+from parallel import BatchSolver, throughput
+from server import PathfindingClient, PathfindingServer
+from mapfile import open_grid, read_ascii_map, save_grid, write_ascii_map
+from stepwise import a_star_steps, advance, bfs_steps
+from benchmark import FAMILIES, build_map, compare, make_queries, run_benchmark
+from generators import CONNECTED, GENERATORS, ensure_connected, flood_fill, generate
+from flow_field import FlowField
 
 
 def test_simple_path():
@@ -104,6 +130,726 @@ def test_complex_maze():
     print("✓ Test passed - path is valid and shortest")
 
 
+def test_grid_buffer():
+    print("\n=== Test 6: Flat Occupancy Buffer ===")
+    obstacles = {(0, 1), (3, 3), (9, 0)}
+    grid = GridGraph(10, 10, obstacles)
+    print(f"Buffer size: {len(grid.cells)} bytes for {grid.rows * grid.cols} cells")
+    assert len(grid.cells) == 12 * 12, "Buffer should include a one-cell border"
+    assert grid.obstacles == obstacles, "Obstacle set should round-trip"
+    assert grid.coords(grid.index(3, 7)) == (3, 7)
+    assert not grid.is_valid(3, 3) and grid.is_valid(3, 4)
+    assert not grid.is_valid(-1, 0) and not grid.is_valid(0, 10)
+    assert grid.get_neighbors(0, 0) == [(1, 0)]
+    grid.remove_obstacle(3, 3)
+    grid.add_obstacle(5, 5)
+    assert grid.is_valid(3, 3) and not grid.is_valid(5, 5)
+    print("✓ Test passed")
+
+
+def test_a_star_matches_bfs():
+    print("\n=== Test 7: A* Matches BFS On Buffer Grid ===")
+    obstacles = {
+        (3, 2), (3, 3), (3, 4),
+        (5, 6), (5, 7),
+        (7, 1), (7, 2), (7, 3),
+    }
+    grid = GridGraph(10, 10, obstacles)
+    path_bfs = bfs_shortest_path(grid, (0, 0), (9, 9))
+    path_astar, visited = a_star_shortest_path(grid, (0, 0), (9, 9))
+    print(f"BFS length: {len(path_bfs)}, A* length: {len(path_astar)}, A* visited: {visited}")
+    assert len(path_bfs) == len(path_astar) == 19
+    assert path_astar[0] == (0, 0) and path_astar[-1] == (9, 9)
+    assert a_star_shortest_path(grid, (0, 0), (3, 3)) == (None, 0)
+    print("✓ Test passed")
+
+
+def test_distance_field():
+    print("\n=== Test 8: Level-Synchronous Distance Field ===")
+    obstacles = {
+        (2, 1), (2, 2), (2, 3), (2, 4), (2, 5),
+        (2, 6), (2, 7), (2, 8), (2, 9)
+    }
+    grid = GridGraph(10, 10, obstacles)
+    distances, parents = bfs_distance_field(grid, (0, 0), with_parents=True)
+    print(f"Reached cells: {reached_count(distances)}")
+    assert reached_count(distances) == 100 - len(obstacles)
+    assert distances[grid.index(9, 9)] == 18
+    assert distances[grid.index(2, 5)] == -1
+    for end in [(9, 9), (3, 9), (0, 9), (0, 0)]:
+        path = path_from_field(grid, distances, parents, end)
+        assert path == bfs_shortest_path(grid, (0, 0), end), \
+            f"Field path to {end} differs from BFS"
+    blocked = GridGraph(10, 10, {(1, i) for i in range(10)})
+    distances, parents = bfs_distance_field(blocked, (0, 0), with_parents=True)
+    assert path_from_field(blocked, distances, parents, (9, 9)) is None
+    print("✓ Test passed")
+
+
+def test_batch_paths():
+    print("\n=== Test 9: Batch Queries Grouped By Source ===")
+    obstacles = {
+        (3, 2), (3, 3), (3, 4),
+        (5, 6), (5, 7),
+        (7, 1), (7, 2), (7, 3),
+    }
+    pairs = [
+        ((0, 0), (9, 9)), ((0, 0), (4, 3)), ((9, 0), (0, 9)),
+        ((0, 0), (0, 0)), ((0, 0), (3, 3)), ((0, 0), (9, 9)),
+        ((9, 0), (8, 2)),
+    ]
+    paths = find_paths(10, 10, obstacles, pairs)
+    print(f"Answered {len(paths)} queries from {len({s for s, _ in pairs})} sources")
+    for (start, end), path in zip(pairs, paths):
+        assert path == find_path(10, 10, obstacles, start, end), \
+            f"Batch result for {start}->{end} differs from find_path"
+    assert paths[4] is None
+    print("✓ Test passed")
+
+
+def _random_obstacles(rows, cols, density, seed):
+    rng = random.Random(seed)
+    return {(r, c) for r in range(rows) for c in range(cols)
+            if rng.random() < density and (r, c) not in ((0, 0), (rows - 1, cols - 1))}
+
+
+def _assert_valid_path(path, obstacles, start, end):
+    assert path[0] == start and path[-1] == end
+    for i in range(len(path) - 1):
+        r1, c1 = path[i]
+        r2, c2 = path[i + 1]
+        assert abs(r1 - r2) + abs(c1 - c2) == 1, \
+            f"Path cells not adjacent: {path[i]} to {path[i+1]}"
+    for pos in path:
+        assert pos not in obstacles, f"Path passes through obstacle at {pos}"
+
+
+def test_bidirectional_search():
+    print("\n=== Test 10: Bidirectional BFS And A* ===")
+    total_bfs = total_bi_bfs = total_astar = total_bi_astar = 0
+    for seed in range(20):
+        obstacles = _random_obstacles(30, 30, 0.3, seed)
+        grid = GridGraph(30, 30, obstacles)
+        expected = bfs_shortest_path(grid, (0, 0), (29, 29))
+        path_bfs, visited_bfs = bidirectional_bfs(grid, (0, 0), (29, 29))
+        path_astar, visited_astar = bidirectional_a_star(grid, (0, 0), (29, 29))
+        _, visited_plain = a_star_shortest_path(grid, (0, 0), (29, 29))
+        distances, _ = bfs_distance_field(grid, (0, 0))
+        if expected is None:
+            assert path_bfs is None and path_astar is None
+            continue
+        assert len(path_bfs) == len(path_astar) == len(expected), \
+            f"Bidirectional path not shortest for seed {seed}"
+        _assert_valid_path(path_bfs, obstacles, (0, 0), (29, 29))
+        _assert_valid_path(path_astar, obstacles, (0, 0), (29, 29))
+        total_bfs += reached_count(distances)
+        total_bi_bfs += visited_bfs
+        total_astar += visited_plain
+        total_bi_astar += visited_astar
+    print(f"Expanded: BFS flood {total_bfs}, bidirectional BFS {total_bi_bfs}, "
+          f"A* {total_astar}, bidirectional A* {total_bi_astar}")
+    assert bidirectional_bfs(GridGraph(5, 5, set()), (2, 2), (2, 3))[0] == [(2, 2), (2, 3)]
+    print("✓ Test passed")
+
+
+def test_jump_point_search():
+    print("\n=== Test 11: Jump Point Search ===")
+    for seed in range(20):
+        obstacles = _random_obstacles(30, 30, 0.25, seed)
+        grid = GridGraph(30, 30, obstacles)
+        expected = bfs_shortest_path(grid, (0, 0), (29, 29))
+        path, expanded = jump_point_search(grid, (0, 0), (29, 29))
+        if expected is None:
+            assert path is None
+            continue
+        assert len(path) == len(expected), f"JPS path not shortest for seed {seed}"
+        _assert_valid_path(path, obstacles, (0, 0), (29, 29))
+    open_grid = GridGraph(100, 100, set())
+    path, expanded = jump_point_search(open_grid, (0, 0), (99, 99))
+    _, visited_astar = a_star_shortest_path(open_grid, (0, 0), (99, 99))
+    print(f"Open 100x100: JPS expanded {expanded}, A* visited {visited_astar}")
+    assert len(path) == 199 and expanded < visited_astar
+    print("✓ Test passed")
+
+
+def test_hierarchical_search():
+    print("\n=== Test 12: HPA* Cluster Abstraction ===")
+    obstacles = _random_obstacles(40, 40, 0.25, 7)
+    grid = GridGraph(40, 40, obstacles)
+    rng = random.Random(7)
+    queries = [((rng.randrange(40), rng.randrange(40)), (rng.randrange(40), rng.randrange(40)))
+               for _ in range(30)]
+    exact = HierarchicalGraph(grid, cluster_size=8, entrance_width=1)
+    approximate = HierarchicalGraph(grid, cluster_size=8)
+    for start, end in queries:
+        expected = bfs_shortest_path(grid, start, end)
+        path, _ = hpa_star_shortest_path(exact, start, end)
+        fast_path, _ = hpa_star_shortest_path(approximate, start, end)
+        if expected is None:
+            assert path is None and fast_path is None
+            continue
+        assert len(path) == len(expected), f"Exact HPA* path not shortest for {start}->{end}"
+        _assert_valid_path(path, obstacles, start, end)
+        _assert_valid_path(fast_path, obstacles, start, end)
+    report = suboptimality_report(approximate, queries)
+    print(f"Solved {report['solved']}/{report['queries']}, "
+          f"mean ratio {report['mean_ratio']:.3f}, max ratio {report['max_ratio']:.3f}")
+    assert report["max_ratio"] >= 1.0
+
+    for _ in range(40):
+        cell = (rng.randrange(40), rng.randrange(40))
+        grid.add_obstacle(cell[0], cell[1])
+        obstacles.add(cell)
+    for start, end in queries:
+        expected = bfs_shortest_path(grid, start, end)
+        path, _ = hpa_star_shortest_path(exact, start, end)
+        assert (path is None) == (expected is None), "HPA* used the graph of an older grid"
+        if path is not None:
+            assert len(path) == len(expected)
+            _assert_valid_path(path, obstacles, start, end)
+    print("✓ Test passed")
+
+
+def test_incremental_replanning():
+    print("\n=== Test 13: D* Lite Incremental Replanning ===")
+    obstacles = _random_obstacles(40, 40, 0.2, 11)
+    grid = GridGraph(40, 40, obstacles)
+    planner = IncrementalPlanner(grid, (0, 0), (39, 39))
+    path, _ = planner.plan()
+    rng = random.Random(11)
+    repaired = fresh = 0
+    for _ in range(10):
+        row, col = path[rng.randrange(1, len(path) - 1)]
+        grid.add_obstacle(row, col)
+        path, expanded = planner.plan()
+        expected, visited = a_star_shortest_path(grid, (0, 0), (39, 39))
+        if expected is None:
+            assert path is None
+            break
+        assert len(path) == len(expected), "Repaired path differs from fresh A*"
+        _assert_valid_path(path, grid.obstacles, (0, 0), (39, 39))
+        repaired += expanded
+        fresh += visited
+    print(f"Expanded after edits: incremental {repaired}, fresh A* {fresh}")
+    assert repaired < fresh
+    planner.detach()
+    assert not grid.listeners
+    print("✓ Test passed")
+
+
+def test_weighted_terrain():
+    print("\n=== Test 14: Weighted Terrain (Dial's Dijkstra And A*) ===")
+    swamp = {(r, c): 9 for r in range(1, 9) for c in range(1, 9)}
+    grid = GridGraph(10, 10, set(), swamp)
+    path_dijkstra, visited_dijkstra = dijkstra_shortest_path(grid, (0, 0), (9, 9))
+    path_astar, visited_astar = weighted_a_star_shortest_path(grid, (0, 0), (9, 9))
+    print(f"Cost: Dijkstra {path_cost(grid, path_dijkstra)} ({visited_dijkstra} visited), "
+          f"A* {path_cost(grid, path_astar)} ({visited_astar} visited)")
+    assert path_cost(grid, path_dijkstra) == path_cost(grid, path_astar) == 18
+    assert not any(pos in swamp for pos in path_dijkstra), "Path should go around the swamp"
+    rng = random.Random(3)
+    costs = {(r, c): rng.randint(2, 6) for r in range(30) for c in range(30)}
+    obstacles = _random_obstacles(30, 30, 0.2, 3)
+    grid = GridGraph(30, 30, obstacles, costs)
+    assert grid.min_cost() == 2
+    path_dijkstra, _ = dijkstra_shortest_path(grid, (0, 0), (29, 29))
+    path_astar, _ = weighted_a_star_shortest_path(grid, (0, 0), (29, 29))
+    assert path_cost(grid, path_dijkstra) == path_cost(grid, path_astar)
+    _assert_valid_path(path_astar, obstacles, (0, 0), (29, 29))
+    uniform = GridGraph(10, 10, set())
+    version = uniform.version
+    assert len(dijkstra_shortest_path(uniform, (0, 0), (9, 9))[0]) == 19
+    assert len(weighted_a_star_shortest_path(uniform, (0, 0), (9, 9))[0]) == 19
+    assert uniform.costs is None and uniform.version == version, "Search attached a cost layer to the grid"
+    print("✓ Test passed")
+
+
+def test_eight_connected():
+    print("\n=== Test 15: 8-Connected Movement And Corner Cutting ===")
+    grid = GridGraph(10, 10, set(), connectivity=8)
+    path, visited = a_star_shortest_path(grid, (0, 0), (9, 9))
+    print(f"Open 10x10 diagonal path: {len(path)} cells, {visited} visited")
+    assert len(path) == 10
+    assert len(bfs_shortest_path(grid, (0, 0), (9, 9))) == 10
+    for name, fn in HEURISTICS.items():
+        if name == "manhattan":
+            continue
+        path, _ = a_star_shortest_path(grid, (0, 0), (9, 9), fn)
+        assert len(path) == 10, f"{name} heuristic should keep the diagonal path"
+    corner = {(0, 1), (1, 0)}
+    strict = GridGraph(3, 3, corner, connectivity=8)
+    assert (1, 1) not in strict.get_neighbors(0, 0)
+    assert bfs_shortest_path(strict, (0, 0), (2, 2)) is None
+    cutting = GridGraph(3, 3, {(0, 1)}, connectivity=8, corner_cutting=True)
+    assert cutting.get_neighbors(0, 0) == [(1, 0), (1, 1)]
+    squeeze = GridGraph(3, 3, corner, connectivity=8, corner_cutting=True)
+    assert bfs_shortest_path(squeeze, (0, 0), (2, 2)) is None
+    assert octile_distance(3, 5) == 2 + 3 * DIAGONAL_COST
+    four_connected_only = (bidirectional_bfs, bidirectional_a_star, jump_point_search, dijkstra_shortest_path,
+                           weighted_a_star_shortest_path, HierarchicalGraph)
+    for search in four_connected_only:
+        try:
+            search(grid, (0, 0), (9, 9)) if search is not HierarchicalGraph else search(grid)
+            assert False, f"{search.__name__} should reject an 8-connected grid"
+        except ValueError:
+            pass
+    print("✓ Test passed")
+
+
+def test_search_workspace():
+    print("\n=== Test 16: Reusable Search Workspace ===")
+    obstacles = _random_obstacles(60, 60, 0.25, 5)
+    grid = GridGraph(60, 60, obstacles)
+    workspace = SearchWorkspace(grid)
+    rng = random.Random(5)
+    for _ in range(50):
+        start = (rng.randrange(60), rng.randrange(60))
+        end = (rng.randrange(60), rng.randrange(60))
+        assert bfs_shortest_path(grid, start, end, workspace) == bfs_shortest_path(grid, start, end)
+        assert (a_star_shortest_path(grid, start, end, workspace=workspace) ==
+                a_star_shortest_path(grid, start, end))
+    tracemalloc.start()
+    a_star_shortest_path(grid, (0, 0), (59, 59), workspace=workspace)
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    a_star_shortest_path(grid, (0, 0), (59, 59), workspace=workspace)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Generation after {workspace.generation // 2} searches; "
+          f"extra peak per query: {peak - before} bytes")
+    assert peak - before < len(workspace.stamps) * 4, "Query should not reallocate workspace arrays"
+    workspace.generation = 0xFFFFFFFF - 1
+    assert bfs_shortest_path(grid, (0, 0), (0, 0), workspace) == [(0, 0)]
+    assert a_star_shortest_path(grid, (0, 0), (59, 59), workspace=workspace)[0] is not None
+    assert workspace.generation == 2
+    try:
+        bfs_shortest_path(GridGraph(60, 60, set()), (0, 0), (1, 1), workspace)
+        assert False, "Workspace of another grid should be rejected"
+    except ValueError:
+        pass
+    print("✓ Test passed")
+
+
+def test_path_cache():
+    print("\n=== Test 17: LRU Path Cache With Grid Versions ===")
+    grid = GridGraph(10, 10, {(2, c) for c in range(1, 10)})
+    cache = PathCache(capacity=3)
+    first = cache.find(grid, (0, 0), (9, 9))
+    assert cache.find(grid, (0, 0), (9, 9)) is first
+    reverse_path, _ = cache.find(grid, (9, 9), (0, 0))
+    assert reverse_path == first[0][::-1], "Reverse query should reuse the forward path"
+    assert (cache.hits, cache.misses) == (2, 1)
+    version = grid.version
+    grid.add_obstacle(2, 0)
+    assert grid.version != version
+    assert cache.find(grid, (0, 0), (9, 9))[0] is None, "Edit must invalidate cached path"
+    grid.add_obstacle(2, 0)
+    assert cache.find(grid, (0, 0), (9, 9))[0] is None and cache.hits == 3
+    assert cache.find(grid, (0, 0), (9, 9), bfs_shortest_path) is None
+    cache.find(grid, (0, 0), (1, 1))
+    cache.find(grid, (0, 0), (1, 2))
+    assert len(cache.entries) == 3, "Cache should stay within capacity"
+    weighted = GridGraph(3, 3, set(), {(0, 1): 5})
+    cache.find(weighted, (0, 0), (2, 2))
+    cache.find(weighted, (2, 2), (0, 0))
+    print(f"Cache stats: {cache.stats()}")
+    assert cache.misses == 7, "Weighted grids are not symmetric and must not reuse reversed paths"
+    print("✓ Test passed")
+
+
+def test_component_index():
+    print("\n=== Test 18: Connected Components For Instant Rejection ===")
+    wall = {(5, c) for c in range(20)}
+    grid = GridGraph(20, 20, wall)
+    components = ComponentIndex(grid)
+    assert not components.connected((0, 0), (19, 19))
+    assert components.component_size(0, 0) == 100
+    assert bfs_shortest_path(grid, (0, 0), (19, 19)) is None
+    assert a_star_shortest_path(grid, (0, 0), (19, 19)) == (None, 0), \
+        "A* should reject without expanding any cell"
+    assert jump_point_search(grid, (0, 0), (19, 19)) == (None, 0)
+    grid.remove_obstacle(5, 7)
+    assert not components.dirty, "Opening a cell should merge components incrementally"
+    assert components.connected((0, 0), (19, 19))
+    assert components.component_size(19, 19) == 20 * 20 - 19
+    grid.add_obstacle(3, 3)
+    assert not components.dirty, "Blocking a cell with a connected ring should not split"
+    grid.add_obstacle(5, 7)
+    assert not components.connected((0, 0), (19, 19))
+    rng = random.Random(13)
+    for _ in range(200):
+        row, col = rng.randrange(20), rng.randrange(20)
+        if rng.random() < 0.5:
+            grid.add_obstacle(row, col)
+        else:
+            grid.remove_obstacle(row, col)
+        start = (rng.randrange(20), rng.randrange(20))
+        end = (rng.randrange(20), rng.randrange(20))
+        grid.components = None
+        expected = bfs_shortest_path(grid, start, end) is not None
+        grid.components = components
+        assert components.connected(start, end) == expected
+    components.detach()
+    assert grid.components is None
+    print("✓ Test passed")
+
+
+def test_landmark_heuristic():
+    print("\n=== Test 19: ALT Landmark Heuristic ===")
+    grid = GridGraph(41, 41, _generate_maze(41, seed=4))
+    rooms = [(r, c) for r in range(0, 41, 2) for c in range(0, 41, 2)]
+    rng = random.Random(4)
+    queries = [(rng.choice(rooms), rng.choice(rooms)) for _ in range(20)]
+    for strategy in STRATEGIES:
+        oracle = LandmarkOracle(grid, count=6, strategy=strategy)
+        assert len(oracle.fields) == len(oracle.landmarks) > 0
+        for start, end in queries:
+            path, _ = alt_shortest_path(oracle, start, end)
+            assert len(path) == len(bfs_shortest_path(grid, start, end)), \
+                f"ALT path not shortest with {strategy} landmarks"
+        report = expansion_report(oracle, queries)
+        print(f"{strategy:>9}: Manhattan {report['manhattan_expanded']}, "
+              f"ALT {report['alt_expanded']} ({report['reduction']:.0%} fewer)")
+        assert report["alt_expanded"] <= report["manhattan_expanded"]
+
+    oracle = LandmarkOracle(grid, count=6)
+    for _ in range(60):
+        grid.remove_obstacle(rng.randrange(41), rng.randrange(41))
+    for start, end in queries:
+        path, _ = alt_shortest_path(oracle, start, end)
+        assert len(path) == len(bfs_shortest_path(grid, start, end)), "ALT used fields of an older grid"
+
+    pockets = GridGraph(101, 101, _random_obstacles(101, 101, 0.3, 2))
+    oracle = LandmarkOracle(pockets, count=8)
+    free = [(r, c) for r in range(0, 101, 2) for c in range(0, 101, 2) if pockets.is_valid(r, c)]
+    report = expansion_report(oracle, [(rng.choice(free), rng.choice(free)) for _ in range(10)])
+    assert report["reduction"] > 0.3, "Farthest landmarks fell into a small pocket"
+
+    diagonal = GridGraph(20, 20, _random_obstacles(20, 20, 0.2, 4), connectivity=8)
+    calls = []
+    pushed = []
+    estimate = lambda node: calls.append(node) or 0
+    path, _ = a_star_shortest_path(diagonal, (0, 0), (19, 19), estimate=estimate,
+                                   stats=SearchStats(on_push=lambda row, col: pushed.append((row, col))))
+    assert len(pushed) == len(calls) and all(diagonal.is_valid(row, col) for row, col in pushed)
+    assert calls and path == a_star_shortest_path(diagonal, (0, 0), (19, 19), heuristic_fn=lambda dr, dc: 0)[0]
+    for bad in (lambda: LandmarkOracle(diagonal),
+                lambda: a_star_shortest_path(grid, (0, 0), (2, 2), heuristic_fn=abs, estimate=estimate)):
+        try:
+            bad()
+            assert False, "Unsupported ALT combination should be rejected"
+        except ValueError:
+            pass
+    print("✓ Test passed")
+
+
+def test_parallel_batch():
+    print("\n=== Test 20: Process-Pool Batch Solver ===")
+    obstacles = _random_obstacles(40, 40, 0.3, 6)
+    grid = GridGraph(40, 40, obstacles)
+    rng = random.Random(6)
+    free = [(r, c) for r in range(40) for c in range(40) if (r, c) not in obstacles]
+    pairs = [(rng.choice(free), rng.choice(free)) for _ in range(120)]
+    expected = [a_star_shortest_path(grid, start, end) for start, end in pairs]
+
+    with BatchSolver(grid, workers=2, chunksize=16) as solver:
+        assert list(solver.map(pairs)) == expected, "Ordered results differ from serial A*"
+        completed = dict(solver.as_completed(pairs))
+        assert [completed[i] for i in range(len(pairs))] == expected
+
+        start, end = pairs[0]
+        grid.add_obstacle(end[0], end[1])
+        assert next(solver.map(pairs[:1]))[0] is None, "Workers did not see the grid update"
+        grid.remove_obstacle(end[0], end[1])
+
+    for workers in (1, 2):
+        print(f"   {workers} worker(s): {throughput(grid, pairs, workers):.0f} queries/s")
+    print("✓ Test passed")
+
+
+def test_async_server():
+    print("\n=== Test 21: Asyncio Pathfinding Server ===")
+    obstacles = _generate_maze(81, seed=3)
+    grid = GridGraph(81, 81, obstacles)
+    expected = len(bfs_shortest_path(grid, (0, 0), (80, 80)))
+    for budget in (0, -1):
+        try:
+            a_star_shortest_path(grid, (0, 0), (80, 80), max_expansions=budget)
+            assert False, "Non-positive expansion budget should be rejected"
+        except ValueError:
+            pass
+
+    async def scenario():
+        server = PathfindingServer(workers=2)
+        port = await server.start()
+        client = await PathfindingClient.connect(port=port)
+        try:
+            loaded = await client.request("load", grid="maze", rows=81, cols=81,
+                                          obstacles=[list(cell) for cell in obstacles])
+            assert loaded["ok"]
+
+            responses = await asyncio.gather(*[
+                client.request("find", grid="maze", start=[0, 0], end=[80, 80]) for _ in range(4)])
+            assert all(r["ok"] and len(r["path"]) == expected for r in responses)
+            stats = await client.request("stats")
+            assert stats["searches"] == 1 and stats["coalesced"] == 3, "Identical queries were not coalesced"
+
+            budget = await client.request("find", grid="maze", start=[0, 0], end=[80, 80], max_expansions=5)
+            assert not budget["ok"] and budget["visited"] == 5
+
+            version = loaded["version"]
+            partial = await client.request("update", grid="maze", block=[[0, 0], [1, "x"]])
+            assert not partial["ok"] and server.grids["maze"].version == version
+            assert server.shared["maze"].version == version and server.grids["maze"].is_valid(0, 0)
+            await client.request("update", grid="maze", block=[[80, 80]])
+            blocked = await client.request("find", grid="maze", start=[0, 0], end=[80, 80])
+            assert blocked["ok"] and blocked["path"] is None
+
+            unknown = await client.request("find", grid="missing", start=[0, 0], end=[1, 1])
+            assert not unknown["ok"]
+            malformed = await client.request("find", grid=[1], start=[0, 0], end=[1, 1])
+            assert not malformed["ok"] and "grid" in malformed["error"]
+            await client.request("load", grid="diagonal", rows=6, cols=6, connectivity=8)
+            diagonal = await client.request("find", grid="diagonal", start=[0, 0], end=[5, 5])
+            assert diagonal["ok"] and len(diagonal["path"]) == 6
+            rejected = await client.request("find", grid="diagonal", start=[0, 0], end=[5, 5], algorithm="dijkstra")
+            assert not rejected["ok"] and "4-connected" in rejected["error"]
+
+            await client.request("load", grid="open", rows=700, cols=700)
+            began = time.perf_counter()
+            timed_out = await asyncio.gather(*[
+                client.request("find", grid="open", start=[0, row], end=[699, 699],
+                               algorithm="dijkstra", timeout=0.05) for row in range(2)])
+            assert all(not r["ok"] and r["error"] == "time budget exceeded" for r in timed_out)
+            while (await client.request("stats"))["in_flight"]:
+                await asyncio.sleep(0.01)
+            assert time.perf_counter() - began < 0.8, "Timed out searches kept the workers busy"
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(scenario())
+    print("✓ Test passed")
+
+
+def test_map_files():
+    print("\n=== Test 22: Memory-Mapped Map Files ===")
+    grid = GridGraph(30, 40, _random_obstacles(30, 40, 0.3, 8), connectivity=8)
+    grid.set_cost(4, 5, 9)
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = os.path.join(directory, "random.grid")
+        save_grid(grid, binary_path)
+        opened = open_grid(binary_path)
+        assert bytes(opened.cells) == bytes(grid.cells) and bytes(opened.costs) == bytes(grid.costs)
+        assert opened.connectivity == 8 and opened.min_cost() == 1
+        assert a_star_shortest_path(opened, (0, 0), (29, 39)) == a_star_shortest_path(grid, (0, 0), (29, 39))
+
+        free = next((r, c) for r in range(30) for c in range(40) if grid.is_valid(r, c))
+        opened.add_obstacle(free[0], free[1])
+        assert open_grid(binary_path).is_valid(free[0], free[1]), "Copy-on-write edit reached the file"
+
+        ascii_path = os.path.join(directory, "random.map")
+        write_ascii_map(grid, ascii_path)
+        imported = read_ascii_map(ascii_path)
+        assert bytes(imported.cells) == bytes(grid.cells) and imported.connectivity == 8
+
+        with open(ascii_path, "w") as file:
+            file.write("type octile\nheight 2\nwidth 3\nmap\n.T@\nGS.\n")
+        imported = read_ascii_map(ascii_path, connectivity=4)
+        assert imported.obstacles == {(0, 1), (0, 2)}
+    print("✓ Test passed")
+
+
+def test_stepwise_search():
+    print("\n=== Test 23: Stepwise Search With Budgets ===")
+    for seed in range(20):
+        obstacles = _random_obstacles(25, 25, 0.3, seed)
+        grid = GridGraph(25, 25, obstacles)
+        rng = random.Random(seed)
+        start = (rng.randrange(25), rng.randrange(25))
+        end = (rng.randrange(25), rng.randrange(25))
+
+        steps = list(bfs_steps(grid, start, end, budget=7))
+        assert steps[-1].done and steps[-1].path == bfs_shortest_path(grid, start, end)
+        assert all(len(step.closed) == 7 for step in steps[:-1])
+
+        expected_path, expected_visited = a_star_shortest_path(grid, start, end)
+        final = list(a_star_steps(grid, start, end, budget=5))[-1]
+        assert final.path == expected_path
+        if expected_path is not None:
+            assert final.expanded == expected_visited
+
+    grid = GridGraph(101, 101, _generate_maze(101, seed=5))
+    search = a_star_steps(grid, (0, 0), (100, 100), budget=50)
+    progress = next(search)
+    assert not progress.done and progress.expanded == 50
+    partial = progress.partial_path()
+    assert partial[0] == (0, 0) and len(partial) > 1
+    search.close()
+    assert next(search, None) is None, "Closed search must not resume"
+
+    progress = advance(bfs_steps(grid, (0, 0), (100, 100), budget=64), seconds=10.0)
+    assert progress.done and progress.path is not None
+    print("✓ Test passed")
+
+
+def test_benchmark_harness():
+    print("\n=== Test 24: Benchmark Harness ===")
+    for family in FAMILIES:
+        first = build_map(family, 41, seed=1)
+        assert bytes(first.cells) == bytes(build_map(family, 41, seed=1).cells), f"{family} is not reproducible"
+        if not family.startswith("random"):
+            start, end = make_queries(first, 1)[0]
+            assert bfs_shortest_path(first, start, end) is not None, f"{family} corners are disconnected"
+
+    report = run_benchmark(sizes=[41], families=["maze", "rooms"], algorithms=["bfs", "a_star"],
+                           queries=3, measure_memory=False, log=None)
+    assert len(report["results"]) == 4
+    assert all(entry["found"] == 3 for entry in report["results"])
+    assert compare(report, report) == []
+
+    slower = json.loads(json.dumps(report))
+    for entry in slower["results"]:
+        entry["time_ms"] /= 2
+        if entry["expanded"] is not None:
+            entry["expanded"] -= 1
+    regressions = compare(report, slower, threshold=0.5)
+    assert any("time_ms" in line for line in regressions)
+    assert any("a_star: expanded" in line for line in regressions)
+    print(f"   {len(regressions)} regressions flagged against a doctored baseline")
+    print("✓ Test passed")
+
+
+def test_search_instrumentation():
+    print("\n=== Test 25: Search Instrumentation ===")
+    searches = [bfs_shortest_path, a_star_shortest_path, bidirectional_bfs, bidirectional_a_star,
+                jump_point_search, dijkstra_shortest_path]
+    for seed in range(10):
+        grid = GridGraph(30, 30, _random_obstacles(30, 30, 0.3, seed))
+        rng = random.Random(seed)
+        start = (rng.randrange(30), rng.randrange(30))
+        end = (rng.randrange(30), rng.randrange(30))
+        for search in searches:
+            expanded, pushed = [], []
+            stats = SearchStats(on_expand=lambda row, col: expanded.append((row, col)),
+                                on_push=lambda row, col: pushed.append((row, col)))
+            assert search(grid, start, end, stats=stats) == search(grid, start, end), search.__name__
+            if stats.searches:
+                assert stats.expanded == len(expanded), search.__name__
+                assert stats.heap_peak >= 1 and stats.pushes >= len(pushed)
+                assert "search" in stats.timings and "reconstruct" in stats.timings
+
+    grid = GridGraph(101, 101, _generate_maze(101, seed=3))
+    stats = SearchStats()
+    path, visited = a_star_shortest_path(grid, (0, 0), (100, 100), stats=stats)
+    assert path is not None and stats.expanded == visited
+    bfs_shortest_path(grid, (0, 0), (100, 100), stats=stats)
+    assert stats.searches == 2 and stats.expanded > visited
+    print(f"   totals over 2 searches: {stats.as_dict()}")
+    print("✓ Test passed")
+
+
+def test_map_generators():
+    print("\n=== Test 26: Seeded Map Generators ===")
+    for kind in GENERATORS:
+        first = generate(kind, 23, 31, seed=7)
+        assert bytes(first.cells) == bytes(generate(kind, 23, 31, seed=7).cells), f"{kind} is not reproducible"
+        for seed in range(10):
+            grid = generate(kind, 23, 31, seed=seed, connect=((0, 0), (22, 30)))
+            assert bfs_shortest_path(grid, (0, 0), (22, 30)) is not None, f"{kind} seed {seed} is disconnected"
+            if kind in CONNECTED:
+                grid = generate(kind, 23, 31, seed=seed)
+                free = [(row, col) for row in range(23) for col in range(31) if grid.is_valid(row, col)]
+                assert bin(flood_fill(grid, free[0])).count("1") == len(free), f"{kind} has isolated pockets"
+
+    grid = generate("random", 30, 30, seed=3, density=0.4)
+    reached = flood_fill(grid, (0, 0)) if grid.is_valid(0, 0) else 0
+    for row in range(30):
+        for col in range(30):
+            expected = grid.is_valid(0, 0) and bfs_shortest_path(grid, (0, 0), (row, col)) is not None
+            assert bool(reached >> grid.index(row, col) & 1) == expected
+
+    walled = GridGraph(9, 9, [(4, col) for col in range(9)])
+    assert ensure_connected(walled, (0, 0), (8, 8))
+    assert bfs_shortest_path(walled, (0, 0), (8, 8)) is not None
+    assert not ensure_connected(walled, (0, 0), (8, 8))
+
+    density = 1 - sum(generate("random", 200, 200, seed=1, density=0.3).cells) / 40000
+    assert 0.28 < density < 0.32, density
+    print(f"   random-30 density {density:.3f}")
+    print("✓ Test passed")
+
+
+def test_flow_field():
+    print("\n=== Test 27: Flow Field For A Shared Goal ===")
+    rng = random.Random(27)
+    for case in range(12):
+        connectivity = 4 if case % 2 == 0 else 8
+        obstacles = [(rng.randrange(14), rng.randrange(18)) for _ in range(70)]
+        costs = {(rng.randrange(14), rng.randrange(18)): rng.randint(1, 9) for _ in range(40)} if case % 4 == 0 else None
+        goal = (rng.randrange(14), rng.randrange(18))
+        grid = GridGraph(14, 18, [cell for cell in obstacles if cell != goal], costs=costs, connectivity=connectivity)
+        field = FlowField(grid, goal, rebuild_share=1.0)
+        rebuilding = FlowField(grid, goal, rebuild_share=0.0)
+
+        for row in range(14):
+            for col in range(18):
+                path = field.path((row, col))
+                if costs is not None:
+                    reference, _ = dijkstra_shortest_path(grid, (row, col), goal)
+                else:
+                    reference, _ = a_star_shortest_path(grid, (row, col), goal)
+                assert (path is None) == (reference is None), f"case {case}: reachability differs at {(row, col)}"
+                if path is None:
+                    continue
+                assert path[0] == (row, col) and path[-1] == goal
+                assert all(grid.is_valid(r, c) for r, c in path)
+                if costs is not None:
+                    assert abs(field.distance(row, col) - path_cost(grid, path)) < 1e-9
+                    assert path_cost(grid, path) == path_cost(grid, reference)
+                elif connectivity == 4:
+                    assert len(path) == len(reference) and field.distance(row, col) == len(path) - 1
+                else:
+                    diagonal = lambda cells: sum(a[0] != b[0] and a[1] != b[1] for a, b in zip(cells, cells[1:]))
+                    length = lambda cells: len(cells) - 1 + (math.sqrt(2) - 1) * diagonal(cells)
+                    assert abs(length(path) - length(reference)) < 1e-9
+                if path[1:]:
+                    assert field.next_cell(row, col) == path[1]
+
+        for _ in range(20):
+            for _ in range(rng.randint(1, 3)):
+                row, col = rng.randrange(14), rng.randrange(18)
+                if rng.random() < 0.6:
+                    grid.add_obstacle(row, col)
+                else:
+                    grid.remove_obstacle(row, col)
+            changed = bool(field.pending) and goal not in [grid.coords(index) for index in field.pending]
+            repaired = field.refresh()
+            assert not changed or repaired < grid.size, "Field was rebuilt instead of repaired"
+            if rebuilding.pending:
+                assert rebuilding.refresh() == grid.size
+            rebuilt = FlowField(grid, goal)
+            rebuilt.detach()
+            for incremental in (field, rebuilding):
+                assert all(abs(a - b) < 1e-9 for a, b in zip(incremental.distances, rebuilt.distances)), f"case {case}"
+        for incremental in (field, rebuilding):
+            incremental.detach()
+            assert incremental._on_cell_changed not in grid.listeners
+
+    grid = GridGraph(5, 5, [(2, col) for col in range(4)])
+    field = FlowField(grid, (4, 0))
+    assert field.direction(0, 0) == (0, 1) and field.distance(0, 0) == 12
+    grid.add_obstacle(2, 4)
+    assert field.path((0, 0)) is None and field.direction(0, 0) is None
+    grid.remove_obstacle(2, 0)
+    assert field.path((0, 0)) == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+    assert field.direction(4, 0) is None and field.distance(9, 9) is None
+    grid.set_cost(3, 0, 5)
+    assert field.distance(0, 0) == 8 and field.refresh() == 0
+    print(f"   {len(field.directions)} int8 directions for a 5x5 grid")
+    print("✓ Test passed")
+
+
 def analyze_bfs_properties():
     print("\n=== BFS Algorithm Properties ===")
     
@@ -195,6 +941,116 @@ def demonstrate_path_reconstruction():
     print("\nThis gives us the shortest path efficiently!")
 
 
+def _generate_maze(size, seed):
+    rng = random.Random(seed)
+    obstacles = {(r, c) for r in range(size) for c in range(size) if r % 2 or c % 2}
+    stack = [(0, 0)]
+    seen = {(0, 0)}
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc, row + dr // 2, col + dc // 2)
+                   for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 0 <= row + dr < size and 0 <= col + dc < size and (row + dr, col + dc) not in seen]
+        if not options:
+            stack.pop()
+            continue
+        new_row, new_col, wall_row, wall_col = rng.choice(options)
+        obstacles.discard((wall_row, wall_col))
+        seen.add((new_row, new_col))
+        stack.append((new_row, new_col))
+    return obstacles
+
+
+def _reference_a_star(grid, start, end):
+    open_set = [(0, start)]
+    parent = {start: None}
+    g_score = {start: 0}
+    visited_set = set()
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current in visited_set:
+            continue
+        visited_set.add(current)
+        if current == end:
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            return path[::-1], len(visited_set)
+        for neighbor in grid.get_neighbors(current[0], current[1]):
+            new_g = g_score[current] + 1
+            if neighbor not in g_score or new_g < g_score[neighbor]:
+                g_score[neighbor] = new_g
+                parent[neighbor] = current
+                heapq.heappush(open_set, (new_g + heuristic(neighbor, end), neighbor))
+    return None, len(visited_set)
+
+
+def analyze_a_star_memory(size=2000):
+    print(f"\n=== A* Core: Flat Arrays vs Dict/Tuple ({size}x{size} maze) ===")
+    grid = GridGraph(size, size, _generate_maze(size, seed=1))
+    corner = size - 1 - (size - 1) % 2
+    for name, search in (("dict/tuple A*  ", _reference_a_star),
+                         ("flat-array A*  ", a_star_shortest_path)):
+        started = time.perf_counter()
+        path, visited = search(grid, (0, 0), (corner, corner))
+        elapsed = (time.perf_counter() - started) * 1000
+        tracemalloc.start()
+        search(grid, (0, 0), (corner, corner))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {name} {elapsed:9.1f} ms  peak {peak / 2 ** 20:7.2f} MiB  "
+              f"visited {visited}  path {len(path)}")
+
+
+def analyze_alt_heuristic(size=401):
+    print(f"\n=== ALT Heuristic: Node Expansions vs Manhattan ===")
+    maps = [
+        ("Test 3 L-shaped maze", GridGraph(10, 10, {(2, c) for c in range(1, 10)})),
+        ("Test 5 complex maze", GridGraph(10, 10, {(3, 2), (3, 3), (3, 4), (5, 6), (5, 7),
+                                                  (7, 1), (7, 2), (7, 3)})),
+        (f"{size}x{size} DFS maze", GridGraph(size, size, _generate_maze(size, seed=2))),
+        (f"{size}x{size} random 30%", GridGraph(size, size, _random_obstacles(size, size, 0.3, 2))),
+    ]
+    for name, grid in maps:
+        rng = random.Random(2)
+        free = [(r, c) for r in range(0, grid.rows, 2) for c in range(0, grid.cols, 2)
+                if grid.is_valid(r, c)]
+        queries = [(rng.choice(free), rng.choice(free)) for _ in range(20)]
+        for strategy in STRATEGIES:
+            report = expansion_report(LandmarkOracle(grid, count=8, strategy=strategy), queries)
+            print(f"   {name:<22} {strategy:>9}: Manhattan {report['manhattan_expanded']:>8}  "
+                  f"ALT {report['alt_expanded']:>8}  reduction {report['reduction']:.0%}")
+
+
+def analyze_map_loading(size=10000):
+    print(f"\n=== Map Loading: {size}x{size} ===")
+    obstacles = _random_obstacles(size, size, 0.3, 5)
+    start_time = time.perf_counter()
+    grid = GridGraph(size, size, obstacles)
+    built_ms = (time.perf_counter() - start_time) * 1000
+    del obstacles
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = os.path.join(directory, "map.grid")
+        ascii_path = os.path.join(directory, "map.map")
+        save_grid(grid, binary_path)
+        write_ascii_map(grid, ascii_path)
+
+        start_time = time.perf_counter()
+        opened = open_grid(binary_path)
+        open_ms = (time.perf_counter() - start_time) * 1000
+        start_time = time.perf_counter()
+        read_ascii_map(ascii_path)
+        ascii_ms = (time.perf_counter() - start_time) * 1000
+        del opened
+
+    print(f"   GridGraph from obstacle set: {built_ms:10.1f} ms")
+    print(f"   ASCII .map import:           {ascii_ms:10.1f} ms")
+    print(f"   Binary map via mmap:         {open_ms:10.3f} ms")
+
+
 def run_all_tests():
     print("=" * 60)
     print("PATHFINDING ALGORITHM - TEST SUITE & ANALYSIS")
@@ -205,10 +1061,35 @@ def run_all_tests():
     test_simple_maze()
     test_start_equals_end()
     test_complex_maze()
+    test_grid_buffer()
+    test_a_star_matches_bfs()
+    test_distance_field()
+    test_batch_paths()
+    test_bidirectional_search()
+    test_jump_point_search()
+    test_hierarchical_search()
+    test_incremental_replanning()
+    test_weighted_terrain()
+    test_eight_connected()
+    test_search_workspace()
+    test_path_cache()
+    test_component_index()
+    test_landmark_heuristic()
+    test_parallel_batch()
+    test_async_server()
+    test_map_files()
+    test_stepwise_search()
+    test_benchmark_harness()
+    test_search_instrumentation()
+    test_map_generators()
+    test_flow_field()
     
     analyze_bfs_properties()
     visualize_bfs_trace()
     demonstrate_path_reconstruction()
+    analyze_a_star_memory(size=200)
+    analyze_alt_heuristic(size=101)
+    analyze_map_loading(size=1000)
     
     print("\n" + "=" * 60)
     print("ALL TESTS PASSED ✓")
@@ -0,0 +1,183 @@
+from typing import List, Tuple, Optional
+import heapq
+
+from algorithm import GridGraph, SearchStats, _finish, _reconstruct, _start_clock
+
+
+def _costs(grid: GridGraph):
+    # Поиск только читает стоимости: без слоя у сетки каждая клетка стоит 1,
+    # а cost_field() не вызывается, чтобы не подключать слой к сетке
+    return grid.costs if grid.costs is not None else bytes([1]) * grid.size
+
+
+def path_cost(grid: GridGraph, path: List[Tuple[int, int]]) -> int:
+    """Стоимость пути: сумма стоимостей всех клеток, кроме стартовой"""
+    costs = _costs(grid)
+    return sum(costs[grid.index(row, col)] for row, col in path[1:])
+
+
+def dijkstra_shortest_path(grid: GridGraph,
+                           start: Tuple[int, int],
+                           end: Tuple[int, int],
+                           stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """
+    Алгоритм Дейкстры с очередью-корзинами (алгоритм Дайала) для целых
+    стоимостей 1..255: 256 корзин по кругу покрывают любой шаг. Только для
+    4-связной сетки: диагональный шаг не целый.
+    Возвращает: (путь, количество посещённых клеток)
+    """
+
+    if grid.connectivity != 4:
+        raise ValueError("Dijkstra supports 4-connected grids only")
+
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        return None, 0
+
+    if start == end:
+        return [start], 1
+
+    if grid.unreachable(start, end):
+        return None, 0
+
+    cells = grid.cells
+    costs = _costs(grid)
+    offsets = grid.offsets
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    span = 256
+    buckets: List[List[int]] = [[] for _ in range(span)]
+    buckets[0].append(source)
+    distance = {source: 0}
+    parent = {source: -1}
+    closed = set()
+    pending = 1
+    current_distance = 0
+    visited_count = 0
+    pushes = 1
+    pending_peak = 1
+    reopened = 0
+
+    while pending:
+        if pending > pending_peak:
+            pending_peak = pending
+        bucket = buckets[current_distance % span]
+        while bucket:
+            current = bucket.pop()
+            pending -= 1
+            if current in closed or distance[current] != current_distance:
+                continue
+
+            closed.add(current)
+            visited_count += 1
+            if on_expand is not None:
+                on_expand(*grid.coords(current))
+
+            if current == target:
+                return _finish(stats, began, (visited_count, pushes, pending_peak, reopened),
+                               _reconstruct, grid, parent, target), visited_count
+
+            for offset in offsets:
+                neighbor = current + offset
+                if not cells[neighbor]:
+                    continue
+                new_distance = current_distance + costs[neighbor]
+                if neighbor not in distance or new_distance < distance[neighbor]:
+                    if neighbor in distance:
+                        reopened += 1
+                    distance[neighbor] = new_distance
+                    parent[neighbor] = current
+                    buckets[new_distance % span].append(neighbor)
+                    pending += 1
+                    pushes += 1
+                    if on_push is not None:
+                        on_push(*grid.coords(neighbor))
+        current_distance += 1
+
+    return _finish(stats, began, (visited_count, pushes, pending_peak, reopened)), visited_count
+
+
+def weighted_a_star_shortest_path(grid: GridGraph,
+                                  start: Tuple[int, int],
+                                  end: Tuple[int, int],
+                                  stats: Optional[SearchStats] = None) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """
+    A* по слою стоимостей сетки. Эвристика - манхэттенское расстояние,
+    умноженное на минимальную стоимость клетки, поэтому остаётся допустимой.
+    Только для 4-связной сетки.
+    Возвращает: (путь, количество посещённых клеток)
+    """
+
+    if grid.connectivity != 4:
+        raise ValueError("Weighted A* supports 4-connected grids only")
+
+    if not grid.is_valid(start[0], start[1]) or not grid.is_valid(end[0], end[1]):
+        return None, 0
+
+    if start == end:
+        return [start], 1
+
+    if grid.unreachable(start, end):
+        return None, 0
+
+    cells = grid.cells
+    costs = _costs(grid)
+    offsets = grid.offsets
+    stride = grid.stride
+    scale = grid.min_cost()
+    source = grid.index(start[0], start[1])
+    target = grid.index(end[0], end[1])
+    end_row, end_col = divmod(target, stride)
+
+    began = _start_clock(stats)
+    on_expand = stats.on_expand if stats is not None else None
+    on_push = stats.on_push if stats is not None else None
+    open_set = [(0, source)]
+    parent = {source: -1}
+    g_score = {source: 0}
+    closed = set()
+    visited_count = 0
+    pushes = 1
+    heap_peak = 1
+    reopened = 0
+
+    while open_set:
+        if len(open_set) > heap_peak:
+            heap_peak = len(open_set)
+        current_f, current = heapq.heappop(open_set)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        visited_count += 1
+        if on_expand is not None:
+            on_expand(*grid.coords(current))
+
+        if current == target:
+            return _finish(stats, began, (visited_count, pushes, heap_peak, reopened),
+                           _reconstruct, grid, parent, target), visited_count
+
+        current_g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if not cells[neighbor]:
+                continue
+
+            new_g = current_g + costs[neighbor]
+            if neighbor not in g_score or new_g < g_score[neighbor]:
+                if neighbor in g_score:
+                    reopened += 1
+                g_score[neighbor] = new_g
+                parent[neighbor] = current
+                row, col = divmod(neighbor, stride)
+                f_score = new_g + scale * (abs(row - end_row) + abs(col - end_col))
+                heapq.heappush(open_set, (f_score, neighbor))
+                pushes += 1
+                if on_push is not None:
+                    on_push(row - 1, col - 1)
+
+    return _finish(stats, began, (visited_count, pushes, heap_peak, reopened)), visited_count